@@ -0,0 +1,267 @@
+"""Times the parsers and analyzers on synthetic corpora at growing scales.
+
+Run from the repository root with the package importable (pip install -e . or PYTHONPATH=src):
+    python -m benchmarks.bench --scale 1 10 100 --output bench.json
+
+Each stage is set up and then measured in fresh processes, so the reported peak RSS belongs to the stage alone.
+"""
+import argparse
+import json
+import logging
+import multiprocessing
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple
+
+from benchmarks import corpora
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def peak_rss_mb() -> Optional[float]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return round(peak / (1024 * 1024 if os.uname().sysname == 'Darwin' else 1024), 1)
+
+
+def _dir_size(directory: Path) -> int:
+    return sum(path.stat().st_size for path in directory.rglob('*') if path.is_file())
+
+
+class Stage(object):
+    """Writes its inputs in setup, prepare returns the timed callable with the number of items and bytes it handles"""
+    name = ''
+    unit = ''
+
+    def setup(self, work_dir: Path, scale: int):
+        pass
+
+    def prepare(self, work_dir: Path, scale: int) -> Tuple[Callable[[], None], int, int]:
+        raise NotImplementedError
+
+    def teardown(self):
+        pass
+
+
+class MC7ParserStage(Stage):
+    name = 'mc7_parser'
+    unit = 'blocks'
+
+    def prepare(self, work_dir, scale):
+        from forensic.analyzers.s7.mc7.mc7_parser import MC7Parser
+        blocks = [block['data'] for block in corpora.mc7_blocks(200 * scale).values()]
+
+        def run():
+            for block in blocks:
+                MC7Parser().parse(block)
+        return run, len(blocks), sum(map(len, blocks))
+
+
+class S7ExportStage(Stage):
+    name = 's7_export'
+    unit = 'devices'
+    devices = 5
+    blocks = 50
+
+    def export(self, work_dir, scale):
+        from forensic.interfaces.plugin import PluginConfig
+        from forensic.plugins.s7.s7 import S7
+        extracted = [{f'10.0.{device // 256}.{device % 256}': corpora.s7_device(self.blocks, device)}
+                     for device in range(self.devices * scale)]
+        plugin = S7(PluginConfig('S7', [], 102, 1, {}, []), work_dir, False)
+        return lambda: plugin.export(extracted), len(extracted)
+
+    def prepare(self, work_dir, scale):
+        run, count = self.export(work_dir, scale)
+        return run, count, 0
+
+
+class S7RawFileParserStage(S7ExportStage):
+    name = 's7_raw_file_parser'
+
+    def setup(self, work_dir, scale):
+        self.export(work_dir, scale)[0]()
+
+    def prepare(self, work_dir, scale):
+        from forensic.analyzers.s7.raw_file_parser import S7RawFileParser
+        from forensic.interfaces.analyzer import AnalyzerConfig
+        analyzer = S7RawFileParser(AnalyzerConfig('S7RawFileParser', {}), work_dir, False)
+        return analyzer.analyze, self.devices * scale, _dir_size(work_dir.joinpath('S7', 'S7RawFileParser'))
+
+
+class S7BlockLogicStage(S7RawFileParserStage):
+    name = 's7_block_logic'
+
+    def setup(self, work_dir, scale):
+        super().setup(work_dir, scale)
+        super().prepare(work_dir, scale)[0]()
+
+    def prepare(self, work_dir, scale):
+        from forensic.analyzers.s7.block_logic import S7BlockLogic
+        from forensic.interfaces.analyzer import AnalyzerConfig
+        analyzer = S7BlockLogic(AnalyzerConfig('S7BlockLogic', {'logic_all': True}), work_dir, False)
+        return analyzer.analyze, self.devices * scale, 0
+
+
+class CodeSysAppParserStage(Stage):
+    name = 'codesys_app_parser'
+    unit = 'apps'
+    apps = 10
+
+    def setup(self, work_dir, scale):
+        for app in range(self.apps * scale):
+            app_dir = work_dir.joinpath('CodeSysV3', 'CS3RawFileParser', f'10_0_{app // 256}_{app % 256}', 'App')
+            app_dir.mkdir(parents=True, exist_ok=True)
+            with open(app_dir.joinpath('App.app'), 'wb') as f:
+                f.write(corpora.codesys_app(areas=16, symbols=200, area_size=4096, seed=app))
+
+    def prepare(self, work_dir, scale):
+        from forensic.analyzers.CodeSysV3.app_parser import parse_app
+        apps = sorted(work_dir.joinpath('CodeSysV3', 'CS3RawFileParser').glob('*/App/App.app'))
+
+        def run():
+            for app in apps:
+                parse_app(app, app.parent)
+        return run, len(apps), sum(app.stat().st_size for app in apps)
+
+
+class CS3RawFileParserStage(CodeSysAppParserStage):
+    name = 'cs3_raw_file_parser'
+    unit = 'devices'
+
+    def prepare(self, work_dir, scale):
+        from forensic.analyzers.CodeSysV3.raw_file_parser import CS3RawFileParser
+        from forensic.interfaces.analyzer import AnalyzerConfig
+        analyzer = CS3RawFileParser(AnalyzerConfig('CS3RawFileParser', {}), work_dir, False)
+        return analyzer.analyze, self.apps * scale, _dir_size(work_dir.joinpath('CodeSysV3', 'CS3RawFileParser'))
+
+
+class ACDParserStage(Stage):
+    name = 'acd_parser'
+    unit = 'routines'
+    programs = 5
+    routines = 10
+    rungs = 20
+
+    def setup(self, work_dir, scale):
+        with open(work_dir.joinpath('project.ACD'), 'wb') as f:
+            f.write(corpora.acd_archive(self.programs * scale, self.routines, self.rungs))
+
+    def prepare(self, work_dir, scale):
+        from forensic.analyzers.RockwellRslogix.acd.project_file import ACDFile
+        acd_path = work_dir.joinpath('project.ACD')
+
+        def run():
+            with ACDFile(acd_path, logging.getLogger()) as acd_file:
+                for program in acd_file.get_controller().programs:
+                    for routine in program.routines:
+                        routine.get_code()
+        return run, self.programs * scale * self.routines, acd_path.stat().st_size
+
+
+class S7AcquisitionStage(Stage):
+    """The S7 plugin end to end against emulated CPUs served by another process, see benchmarks.s7_emulator"""
+    name = 's7_acquisition'
+    unit = 'devices'
+    devices = 5
+    blocks = 50
+    latency = 0.002
+
+    def __init__(self):
+        self._emulator = None
+
+    def prepare(self, work_dir, scale):
+        from forensic.interfaces.plugin import PluginConfig
+        from forensic.plugins.s7.s7 import S7
+        from benchmarks.s7_emulator import emulated_hosts
+        with socket.socket() as sock:
+            sock.bind(('127.1.0.1', 0))
+            port = sock.getsockname()[1]
+        hosts = emulated_hosts(self.devices * scale)
+        self._emulator = subprocess.Popen(
+            [sys.executable, '-m', 'benchmarks.s7_emulator', '--cpus', str(len(hosts)), '--port', str(port),
+             '--blocks', str(self.blocks), '--latency', str(self.latency)], stdout=subprocess.PIPE, text=True)
+        # Serving once it reports its addresses
+        self._emulator.stdout.readline()
+        plugin = S7(PluginConfig('S7', [{'ip': host} for host in hosts], port, 'tcp', {}, []), work_dir, False)
+        return plugin.run, len(hosts), 0
+
+    def teardown(self):
+        if self._emulator is not None:
+            self._emulator.terminate()
+            self._emulator.wait()
+
+
+STAGES: Dict[str, Stage] = {stage.name: stage for stage in [
+    MC7ParserStage(), S7ExportStage(), S7RawFileParserStage(), S7BlockLogicStage(),
+    CodeSysAppParserStage(), CS3RawFileParserStage(), ACDParserStage(), S7AcquisitionStage()]}
+
+
+def _setup(stage_name: str, work_dir: str, scale: int):
+    logging.disable(logging.CRITICAL)
+    STAGES[stage_name].setup(Path(work_dir), scale)
+
+
+def _measure(stage_name: str, work_dir: str, scale: int) -> Dict:
+    logging.disable(logging.CRITICAL)
+    stage = STAGES[stage_name]
+    run, items, size = stage.prepare(Path(work_dir), scale)
+    try:
+        start = time.perf_counter()
+        run()
+        elapsed = time.perf_counter() - start
+    finally:
+        stage.teardown()
+    return {'seconds': round(elapsed, 4), 'items': items, 'bytes': size,
+            'items_per_second': round(items / elapsed, 1) if elapsed else None,
+            'mb_per_second': round(size / elapsed / (1024 * 1024), 2) if elapsed and size else None,
+            'peak_rss_mb': peak_rss_mb()}
+
+
+def benchmark(stage_name: str, scale: int, repeat: int) -> Dict:
+    results = []
+    context = multiprocessing.get_context('spawn')
+    for _ in range(repeat):
+        with tempfile.TemporaryDirectory() as work_dir:
+            with context.Pool(1) as pool:
+                pool.apply(_setup, (stage_name, work_dir, scale))
+            with context.Pool(1) as pool:
+                results.append(pool.apply(_measure, (stage_name, work_dir, scale)))
+    return {'stage': stage_name, 'scale': scale, 'unit': STAGES[stage_name].unit,
+            **min(results, key=lambda result: result['seconds'])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the parsers and analyzers on synthetic corpora')
+    parser.add_argument('--stage', nargs='+', choices=list(STAGES), default=list(STAGES), help='Stages to run')
+    parser.add_argument('--scale', nargs='+', type=int, default=[1, 10, 100], help='Corpus scales, default 1 10 100')
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per measurement, the fastest is reported')
+    parser.add_argument('--output', type=Path, help='JSON file to write the results to')
+    args = parser.parse_args()
+
+    results = []
+    print(f'{"stage":<22}{"scale":>6}{"items":>9}{"seconds":>11}{"items/s":>12}{"MB/s":>9}{"peak RSS MB":>13}')
+    for stage_name in args.stage:
+        for scale in args.scale:
+            result = benchmark(stage_name, scale, args.repeat)
+            results.append(result)
+            print(f'{stage_name:<22}{scale:>6}{result["items"]:>9}{result["seconds"]:>11}'
+                  f'{result["items_per_second"] or "-":>12}{result["mb_per_second"] or "-":>9}'
+                  f'{result["peak_rss_mb"] or "-":>13}', flush=True)
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=4)
+
+
+if __name__ == '__main__':
+    main()
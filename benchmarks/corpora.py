@@ -0,0 +1,181 @@
+"""Synthetic but structurally valid inputs for the parsers, no PLC hardware or customer projects needed."""
+import base64
+import gzip
+import struct
+from typing import Dict, List
+
+
+# S7 MC7 blocks, see forensic.analyzers.s7.mc7.mc7_parser
+def mc7_code_block(num: int, code: bytes = b'\x65\x00', author: str = 'AUTH', name: str = 'BLK',
+                   block_type: int = 0x0C) -> bytes:
+    segment = struct.pack('<HH', 1, len(code))
+    interface = b'\x01\x02\x03\x04'
+    header = b'pp' + struct.pack('>BBBBHI4s6s6s', 1, 1, 1, block_type, num, 0, b'\0' * 4,
+                                 b'\0\0\0\x10\x01\x02', b'\0\0\0\x20\x01\x03')
+    header += struct.pack('>HHHH', len(interface), len(segment), 0, len(code))
+    footer = author.encode().ljust(8, b'\0') + b'FAM'.ljust(8, b'\0') + name.encode().ljust(8, b'\0') + \
+        b'\x11' + struct.pack('<H', 0xBEEF)
+    return header + code + interface + segment + footer.ljust(36, b'\0')
+
+
+def mc7_data_block(num: int) -> bytes:
+    data = struct.pack('>H', 7) + b'\x01'
+    body = bytes([0x05, 0, 0]) + struct.pack('<HH', 4, 1) + bytes([0x05, 0x01, 0x02, 0x01]) + b'\x00\x00\x09'
+    header = b'pp' + struct.pack('>BBBBHI4s6s6s', 1, 1, 5, 0x0A, num, 0, b'\0' * 4,
+                                 b'\0\0\0\x10\x01\x02', b'\0\0\0\x20\x01\x03')
+    header += struct.pack('>HHHH', len(body), 0, 0, len(data))
+    footer = b'A'.ljust(8, b'\0') + b'F'.ljust(8, b'\0') + b'DBX'.ljust(8, b'\0') + b'\x11' + struct.pack('<H', 0x1234)
+    return header + data + body + footer.ljust(36, b'\0')
+
+
+def mc7_blocks(count: int, seed: int = 0) -> Dict[str, Dict]:
+    """Blocks as returned by the S7 plugin upload, code and author differ by seed so devices do not share blocks.
+
+    Block 1 is OB1 calling every FC (CC FC), the call tree the block logic analyzer draws starts from it.
+    """
+    blocks = {}
+    for num in range(1, count + 1):
+        if num == 1:
+            calls = b''.join(b'\x1d' + bytes([fc]) for fc in range(2, min(count, 255) + 1) if fc % 10)
+            blocks['OB1'] = {'type': 'OB', 'num': 1, 'protected': False,
+                             'data': mc7_code_block(1, calls + b'\x65\x00', author=f'A{seed}'[:8], block_type=0x08)}
+        elif num % 10 == 0:
+            blocks[f'DB{num}'] = {'type': 'DB', 'num': num, 'protected': False, 'data': mc7_data_block(num)}
+        else:
+            code = b'\x65\x00' * (1 + (num + seed) % 32)
+            blocks[f'FC{num}'] = {'type': 'FC', 'num': num, 'protected': False,
+                                  'data': mc7_code_block(num, code, author=f'A{seed}'[:8])}
+    return blocks
+
+
+def s7_device(count: int, seed: int = 0) -> List[Dict]:
+    return [{'rack': 0, 'slot': 2, 'supported_szl': [], 'szl': {}, 'blocks': mc7_blocks(count, seed)}]
+
+
+def s7_legacy_device(count: int, seed: int = 0) -> List[Dict]:
+    """The device as exported to JSON before the artifact store, block bytes as base64"""
+    device = s7_device(count, seed)
+    for block in device[0]['blocks'].values():
+        block['data'] = base64.b64encode(block['data']).decode('ascii')
+    return device
+
+
+# CodeSys V3 .app files, see forensic.analyzers.CodeSysV3.file_format
+def _varint(value: int) -> bytes:
+    out = b''
+    while True:
+        low, value = value & 0x7f, value >> 7
+        if not value:
+            return out + bytes([low])
+        out += bytes([low | 0x80])
+
+
+def _tag(tid: int, data: bytes) -> bytes:
+    return _varint(tid) + _varint(len(data)) + data
+
+
+def _pointer_tag(tid: int, pointer: int) -> bytes:
+    return _tag(tid, struct.pack('<HI', 1, pointer))
+
+
+def _code_area(pointer: int, code: bytes) -> bytes:
+    return _tag(0xA0, _tag(0x21, struct.pack('<HI', 0, pointer)) + _tag(0x22, struct.pack('<I', len(code)) + code))
+
+
+def _section(handler: int, data: bytes) -> bytes:
+    return struct.pack('>H', 0x55CD) + struct.pack('<HHHII', 0x0C, 0, handler, 0x1234, len(data)) + data
+
+
+def codesys_symbol_table(count: int) -> bytes:
+    """Internal symbol table read by CodesysV3MemoryDynamicFormat"""
+    strings = b''
+    records = b''
+
+    def string(name: str) -> int:
+        nonlocal strings
+        offset = len(strings)
+        strings += name.encode() + b'\0'
+        return offset
+
+    for i in range(count):
+        records += struct.pack('<IIIHHII', 0, 0, string(f'pou{i}'), 0, 0, 0x2000 + i * 4, 0x3000 + i * 4)
+    for i in range(count):
+        records += struct.pack('<II', i, string(f'struct{i}'))
+    for i in range(count):
+        records += struct.pack('<II', i, string(f'val_struct{i}'))
+    for i in range(count):
+        records += struct.pack('<IIIHHIII', 0, 0, string(f'method{i}'), 0, 0, 0x4000 + i * 4, 0x5000 + i * 4, 0)
+    for i in range(count):
+        records += struct.pack('<I', string(f'lib{i}'))
+    header_size = 4 * 2 + 2 * 6
+    return struct.pack('<II6H', header_size + len(records) + len(strings), 0, count, count, count, 0, count, count) + \
+        records + strings
+
+
+def codesys_app(areas: int = 4, symbols: int = 8, area_size: int = 256, seed: int = 0) -> bytes:
+    table_pointer = 0x1000 * (areas + 1)
+    code_areas = b''.join(_code_area(0x1000 * (i + 1), struct.pack('<I', seed) + bytes([i & 0xff]) * (area_size - 4))
+                          for i in range(areas))
+    code_areas += _code_area(table_pointer, codesys_symbol_table(symbols))
+    symbol_tags = b''.join(_tag(0x50, struct.pack('<HII', 1, 0x1000 + i * 4, 0) + b'sym_%d\x00' % i)
+                           for i in range(symbols))
+    footer = _pointer_tag(0x60, 0x1000) + _pointer_tag(0x61, 0x1004) + _pointer_tag(0x63, 0x1008) + \
+        _pointer_tag(0x6f, table_pointer)
+    info = _tag(1, b'proj\x00') + _tag(3, struct.pack('<I', 1600000000)) + _tag(4, b'author\x00') + _tag(9, b'xx')
+    body = _tag(0x82, code_areas) + _tag(0x85, symbol_tags) + _tag(0x86, footer) + _tag(0x87, info)
+    return _tag(0x10, b'App\x00') + _section(3, _tag(0x81, _tag(0x10, b'Inner\x00'))) + _section(5, body)
+
+
+# Rockwell ACD archives holding comps.dat, sbregion.dat and regnlink.dat, see forensic.analyzers.RockwellRslogix.acd
+_COMPONENT_FORMAT = '<2sIIIIIII124sIIH12sIIIIII4sIIII4sII'
+_RUNG_FORMAT = '<2sIIHI41sI'
+
+
+def _component(uid: int, parent: int, name: str, component_type: int, sub_type: int, data: bytes = b'') -> bytes:
+    return struct.pack(_COMPONENT_FORMAT, b'\xfa\xfa', struct.calcsize(_COMPONENT_FORMAT) + len(data), 0, 0, 0, 0,
+                       uid, parent, name.encode('utf-16-le').ljust(124, b'\0'), 0, 0, 1, b'\0' * 12,
+                       0, 0, 0, 0, 0, 0, b'\0' * 4, 0, 0, component_type, sub_type, b'\0' * 4, 0, len(data)) + data
+
+
+def _rung(uid: int, text: str) -> bytes:
+    content = text.encode('utf-16-le')
+    size = struct.calcsize(_RUNG_FORMAT) + len(content)
+    return struct.pack(_RUNG_FORMAT, b'\xfb\xfb', size, 0, 0, uid, b'rung'.ljust(41, b'\0'), len(content)) + content
+
+
+def _region_link(uid: int, parent: int) -> bytes:
+    return struct.pack('<HIIIII', 0, 1, 0, parent, uid, 0)
+
+
+def _dat_file(records: bytes) -> bytes:
+    records_header = struct.pack('<2sIIIII', b'\0\0', 0x16, 0, 0, 0, 28 + 22)
+    second_header = struct.pack('<2sIIIII', b'\0\0', 0x16 + 4, 0, 0, 0, 0) + b'\0' * 4
+    end = 28 + 22 + len(second_header) + len(records)
+    return struct.pack('<7I', end, 0, end, 28, 0, 0, 0) + records_header + second_header + records
+
+
+def acd_archive(programs: int = 2, routines: int = 3, rungs: int = 4, compress: bool = True) -> bytes:
+    components = _component(1, 0, 'Controller', 0x8e, 0)
+    rung_records = b''
+    links = b''
+    uid = 100
+    for p in range(programs):
+        program_uid, uid = uid, uid + 1
+        components += _component(program_uid, 1, f'Program{p}', 0x68, 1)
+        for r in range(routines):
+            routine_uid, uid = uid, uid + 1
+            components += _component(routine_uid, program_uid, f'Routine{p}_{r}', 0x6d, 0, b'\x01\x02')
+            for g in range(rungs):
+                rung_uid, uid = uid, uid + 1
+                rung_records += _rung(rung_uid, f'XIC(@{struct.pack(">I", routine_uid).hex()}@)OTE(Out{g});')
+                links += _region_link(rung_uid, routine_uid)
+    files = {'comps.dat': _dat_file(components), 'sbregion.dat': _dat_file(rung_records),
+             'regnlink.dat': _dat_file(links)}
+    blob = b'HDR!'
+    records = b''
+    for name, data in files.items():
+        if compress:
+            data = gzip.compress(data)
+        records += name.encode('utf-16-le').ljust(0x208, b'\0') + struct.pack('<II', len(data), len(blob))
+        blob += data
+    return blob + records + struct.pack('<II', len(files), 1)
@@ -0,0 +1,459 @@
+"""S7comm CPU stand-in answering the requests of the S7 plugin, for load and latency testing without hardware.
+
+Serves any number of emulated CPUs, each on its own loopback address (Linux routes all of 127.0.0.0/8):
+    python -m benchmarks.s7_emulator --cpus 200 --blocks 100 --port 10102 --latency 0.005
+    python driver.py S7 --ip 127.1.0.0/24 --port 10102
+
+It speaks the S7comm dialect of forensic.plugins.s7 and is built from its TPKT, COTP and S7 structures: setup
+communication, SZL reads, list blocks, list blocks of type and the block upload sequence, with fragmented
+user data responses when they exceed the negotiated PDU.
+"""
+import argparse
+import asyncio
+import ipaddress
+from typing import Dict, Iterable, List, Set, Tuple
+
+from benchmarks import corpora
+
+try:
+    import resource
+except ImportError:
+    resource = None
+from forensic.common.stream.stream import BinaryReader, BinaryWriter, DataStruct, DataType, bytesbe, ubyte, uint16be
+from forensic.plugins.s7.cotp import (COTP, COTP_CR, COTPLayer, PARAM_CODE_DST_TSAP, PARAM_CODE_SRC_TSAP,
+                                      PARAM_CODE_TPDU_SIZE, TPDU_TYPE_CONNECTION_REQUEST,
+                                      TPDU_TYPE_CONNECTION_RESPONSE, TPDU_TYPE_DATA)
+from forensic.plugins.s7.s7_parser import (BLOCK_TYPE_MAP, FUNCTION_BLOCK, FUNCTION_CPU, FUNCTION_TYPE_RESPONSE,
+                                           NOT_LAST_DATA_UNIT, PARAM_FUNCTION_END_UPLOAD, PARAM_FUNCTION_SETUP_COMM,
+                                           PARAM_FUNCTION_START_UPLOAD, PARAM_FUNCTION_UPLOAD, ROSCTR_ACK_DATA,
+                                           ROSCTR_JOB, ROSCTR_USER_DATA, SUBFUNCTION_BLOCK_INFO, SUBFUNCTION_LIST_BLOCK,
+                                           SUBFUNCTION_LIST_BLOCKS_OF_TYPE, SUBFUNCTION_READ_SZL, YES_LAST_DATA_UNIT,
+                                           S7BlockInfo, S7BlockInfoRequest,
+                                           S7DataFragment, S7LayerResponse, S7ListBlocksEntry, S7ListBlocksOfType,
+                                           S7ListBlocksOfTypeEntry, S7ParamEndUpload, S7ParamEndUploadRequest,
+                                           S7ParamSetupCommunication, S7ParamStartUpload, S7ParamStartUploadRequest,
+                                           S7ParamUpload, S7ParamUploadRequest, S7ParamUserData,
+                                           S7ParamUserDataRequest, S7ParamUserDataRequestFragmented, S7Request,
+                                           S7Szl, S7SzlRequest, reverse_map_convert)
+from forensic.plugins.s7.s7_szl import (S7COMMSzl_0, S7COMMSzl_11_1, S7COMMSzl_11_7, S7COMMSzl_1C_1, S7COMMSzl_1C_2,
+                                        S7COMMSzl_1C_5, S7COMMSzl_1C_7, S7COMMSzl_31_3, S7COMMSzl_32_4,
+                                        S7COMMSzl_424)
+from forensic.plugins.s7.tpkt import TPKT, TPKTLayer
+
+ERROR_NOT_PERMITTED = 0xd241
+ERROR_BLOCK_NOT_FOUND = 0xd20e
+ERROR_NOT_IMPLEMENTED = 0x8104
+# S7 header of user data responses, their parameters and the fragment header of their data
+USER_DATA_OVERHEAD = S7LayerResponse.get_size() + S7ParamUserData.get_size() + S7DataFragment.get_size()
+# S7 header of acknowledgements with their error code, and the upload parameters
+UPLOAD_OVERHEAD = S7LayerResponse.get_size() + uint16be.size + S7ParamUpload.get_size()
+
+
+def _record(struct_class, values: Dict) -> bytes:
+    """Writes an SZL record, strings are written as fixed size null padded fields"""
+    bw = BinaryWriter()
+    for field, dt in struct_class.get_members():
+        value = values.get(field, {DataType.BYTES: b'', DataType.NULL_TERMNINATED_ASCII_STRING: ''}.get(dt.data_type, 0))
+        if dt.data_type == DataType.NULL_TERMNINATED_ASCII_STRING:
+            bw.write(bytesbe(dt.size), value.encode('ascii')[:dt.size].ljust(dt.size, b'\0'))
+        elif dt.data_type == DataType.BYTES:
+            bw.write(bytesbe(dt.size), value.ljust(dt.size, b'\0'))
+        else:
+            bw.write(dt, value)
+    return bw.dump()
+
+
+class EmulatedCpu(object):
+    """What a CPU holds and how it behaves: blocks, identity, served racks and slots, PDU and COTP TPDU sizes, jobs
+    outstanding per connection (AmQ), latency, the connections it accepts at once and how often it drops them."""
+
+    def __init__(self, blocks: Dict[str, Dict] = None, protected: Iterable[str] = (),
+                 rack_slots: Iterable[Tuple[int, int]] = ((0, 2),), pdu_size: int = 480, tpdu_size: int = 1024,
+                 amq: int = 3, latency: float = 0.0, max_connections: int = 8, drop_every: int = 0,
+                 serial: str = 'S C-EMULATED', module: str = '6ES7 315-2EH14-0AB0') -> None:
+        blocks = corpora.mc7_blocks(20) if blocks is None else blocks
+        # Blocks by their S7 type code and number, e.g. ('0C', 1) for FC1
+        self.blocks = {(reverse_map_convert(BLOCK_TYPE_MAP, block['type']), block['num']): block['data']
+                       for block in blocks.values()}
+        self.protected: Set[Tuple[str, int]] = {(reverse_map_convert(BLOCK_TYPE_MAP, blocks[name]['type']),
+                                                 blocks[name]['num']) for name in protected}
+        self.rack_slots = set(rack_slots)
+        self.pdu_size = pdu_size
+        # COTP codes the TPDU size as its binary logarithm
+        self.tpdu_size = tpdu_size.bit_length() - 1
+        self.amq = amq
+        self.latency = latency
+        self.max_connections = max_connections
+        # Connections are reset after this many requests, as over a flaky link
+        self.drop_every = drop_every
+        self.connections = 0
+        self.szl = self._build_szl(serial, module)
+
+    @staticmethod
+    def _build_szl(serial: str, module: str) -> Dict[int, Tuple[int, List[bytes]]]:
+        records = {
+            0x11: [_record(S7COMMSzl_11_1, {'index': 1, 'module': module, 'version': 0x2000}),
+                   _record(S7COMMSzl_11_7, {'index': 7, 'module': module, 'version': 0x5603, 'release': 0x0604})],
+            0x1c: [_record(S7COMMSzl_1C_1, {'index': 1, 'plc_name': 'SIMATIC 300'}),
+                   _record(S7COMMSzl_1C_2, {'index': 2, 'module_name': 'CPU 315-2 PN/DP'}),
+                   _record(S7COMMSzl_1C_5, {'index': 5, 'serial_number': serial}),
+                   _record(S7COMMSzl_1C_7, {'index': 7, 'module_type_name': 'CPU 315-2 PN/DP'})],
+            0x424: [_record(S7COMMSzl_424, {'plc_run_mode': 8})],
+            0x131: [_record(S7COMMSzl_31_3, {'index': 3})],
+            0x132: [_record(S7COMMSzl_32_4, {'index': 4, 'key': 1, 'real_state': 1})],
+        }
+        supported = [0x11, 0x1c, 0x424, 0x31, 0x32]
+        records[0] = [_record(S7COMMSzl_0, {'szl_id': szl_id}) for szl_id in supported]
+        return {szl_id: (len(entries[0]), entries) for szl_id, entries in records.items()}
+
+
+class S7Session(object):
+    """Server side of a single connection"""
+
+    def __init__(self, cpu: EmulatedCpu) -> None:
+        self.cpu = cpu
+        self.pdu_size = cpu.pdu_size
+        self.tpdu_size = cpu.tpdu_size
+        self._fragments: Dict[int, List[bytes]] = {}
+        self._next_sequence = 1
+        self._uploads: Dict[int, List[bytes]] = {}
+        self._next_upload = 1
+
+    def connect(self, br: BinaryReader) -> bytes:
+        """Answers the COTP connection request, None when the CPU does not serve the requested rack and slot"""
+        cotp = COTPLayer(br)
+        if cotp.tpdu != TPDU_TYPE_CONNECTION_REQUEST:
+            return None
+        request = COTP_CR(br)
+        cotp_vars = COTP().parse_cotp_vars(br)
+        if not isinstance(cotp_vars.dst_tsap, int) or \
+                ((cotp_vars.dst_tsap & 0xff) >> 5, cotp_vars.dst_tsap & 0x1f) not in self.cpu.rack_slots:
+            return None
+
+        if isinstance(cotp_vars.tpdu_size, int):
+            self.tpdu_size = min(self.tpdu_size, cotp_vars.tpdu_size)
+
+        bw_internal = BinaryWriter()
+        bw_internal.write_struct(COTP_CR, {'dstref': request.srcref, 'srcref': 0x44, 'flags': 0})
+        bw_internal.write(ubyte, PARAM_CODE_TPDU_SIZE)
+        bw_internal.write(ubyte, 1)
+        bw_internal.write(ubyte, self.tpdu_size)
+        bw_internal.write(ubyte, PARAM_CODE_SRC_TSAP)
+        bw_internal.write(ubyte, 2)
+        bw_internal.write(uint16be, cotp_vars.dst_tsap)
+        bw_internal.write(ubyte, PARAM_CODE_DST_TSAP)
+        bw_internal.write(ubyte, 2)
+        bw_internal.write(uint16be, cotp_vars.src_tsap if isinstance(cotp_vars.src_tsap, int) else 0x100)
+
+        bw = BinaryWriter()
+        bw.write_struct(COTPLayer, {'size': len(bw_internal) + 1, 'tpdu': TPDU_TYPE_CONNECTION_RESPONSE})
+        return TPKT().write(3, bw + bw_internal).dump()
+
+    def handle(self, br: BinaryReader) -> bytes:
+        """Answers a COTP data TPDU, None for the empty acknowledgements of the client"""
+        cotp = COTP().parse(br)
+        if cotp.tpdu != TPDU_TYPE_DATA or br.remaining_data() == 0:
+            return None
+
+        request = S7Request(br)
+        param = br.read(bytesbe(request.param_len))
+        data = br.read(bytesbe(request.data_len))
+        if request.rosctr == ROSCTR_JOB:
+            response = self._job(request, param)
+        elif request.rosctr == ROSCTR_USER_DATA:
+            response = self._user_data(request, param, data)
+        else:
+            return None
+
+        # S7 PDUs larger than the TPDU are sent in several COTP data units, the last one flagged
+        payload = response.dump()
+        unit_size = (1 << self.tpdu_size) - COTPLayer.get_size() - 1
+        frames = []
+        for start in range(0, len(payload), unit_size):
+            dt = BinaryWriter()
+            dt.write_struct(COTPLayer, {'size': 2, 'tpdu': TPDU_TYPE_DATA})
+            dt.write(ubyte, 0x80 if start + unit_size >= len(payload) else 0)
+            dt.write(bytesbe(len(payload[start:start + unit_size])), payload[start:start + unit_size])
+            frames.append(TPKT().write(3, dt).dump())
+        return b''.join(frames)
+
+    def _header(self, request: S7Request, rosctr: int, param: BinaryWriter, data: BinaryWriter,
+                error: int = None) -> BinaryWriter:
+        bw = BinaryWriter()
+        bw.write_struct(S7LayerResponse, {'protocol_id': 0x32, 'rosctr': rosctr, 'reserved': 0,
+                                          'pdur': int.from_bytes(request.pdur.to_bytes(2, 'little'), 'big'),
+                                          'param_len': len(param), 'data_len': len(data)})
+        if error is not None:
+            bw.write(uint16be, error)
+        return bw + param + data
+
+    def _ack(self, request: S7Request, param: BinaryWriter = None, error: int = 0) -> BinaryWriter:
+        return self._header(request, ROSCTR_ACK_DATA, param or BinaryWriter(), BinaryWriter(), error)
+
+    def _job(self, request: S7Request, param: bytes) -> BinaryWriter:
+        br = BinaryReader(param)
+        function = param[0]
+        bw = BinaryWriter()
+
+        if function == PARAM_FUNCTION_SETUP_COMM:
+            setup = S7ParamSetupCommunication(br)
+            self.pdu_size = min(setup.pdu_length, self.cpu.pdu_size)
+            bw.write_struct(S7ParamSetupCommunication, {'function': function, 'reserved': 0,
+                                                        'max_sessions': min(setup.max_sessions, self.cpu.amq),
+                                                        'curr_sessions': min(setup.curr_sessions, self.cpu.amq),
+                                                        'pdu_length': self.pdu_size})
+            return self._ack(request, bw)
+
+        if function == PARAM_FUNCTION_START_UPLOAD:
+            start = S7ParamStartUploadRequest(br)
+            name = br.read(bytesbe(start.name_length)).decode('ascii', 'replace')
+            block = (name[1:3], int(name[3:8]))
+            if block in self.cpu.protected:
+                return self._ack(request, error=ERROR_NOT_PERMITTED)
+            if block not in self.cpu.blocks:
+                return self._ack(request, error=ERROR_BLOCK_NOT_FOUND)
+            data = self.cpu.blocks[block]
+            chunk = max(1, self.pdu_size - UPLOAD_OVERHEAD)
+            upload_id, self._next_upload = self._next_upload, self._next_upload + 1
+            self._uploads[upload_id] = [data[i:i + chunk] for i in range(0, len(data), chunk)] or [b'']
+            block_size = b'%08d' % len(data)
+            bw.write_struct(S7ParamStartUpload, {'function': function, 'status': 0, 'unk': 0,
+                                                 'upload_id': upload_id, 'block_size_length': len(block_size)})
+            bw.write(bytesbe(len(block_size)), block_size)
+            return self._ack(request, bw)
+
+        if function == PARAM_FUNCTION_UPLOAD:
+            upload_id = S7ParamUploadRequest(br).upload_id
+            chunks = self._uploads.get(upload_id)
+            if not chunks:
+                return self._ack(request, error=ERROR_BLOCK_NOT_FOUND)
+            chunk = chunks.pop(0)
+            bw.write_struct(S7ParamUpload, {'function': function,
+                                            'status': NOT_LAST_DATA_UNIT if chunks else YES_LAST_DATA_UNIT,
+                                            'length': len(chunk), 'unk': 0})
+            bw.write(bytesbe(len(chunk)), chunk)
+            return self._ack(request, bw)
+
+        if function == PARAM_FUNCTION_END_UPLOAD:
+            self._uploads.pop(S7ParamEndUploadRequest(br).upload_id, None)
+            bw.write_struct(S7ParamEndUpload, {'function': function})
+            return self._ack(request, bw)
+
+        return self._ack(request, error=ERROR_NOT_IMPLEMENTED)
+
+    def _user_data(self, request: S7Request, param: bytes, data: bytes) -> BinaryWriter:
+        header = S7ParamUserDataRequest(BinaryReader(param))
+        function = header.function & 0x0F
+        if header.internal_param_len == 8:
+            sequence_num = S7ParamUserDataRequestFragmented(BinaryReader(param)).sequence_num
+            return self._fragment(request, function, header.sub_function, sequence_num)
+
+        payload = None
+        if (function, header.sub_function) == (FUNCTION_CPU, SUBFUNCTION_READ_SZL):
+            payload = self._read_szl(S7SzlRequest(BinaryReader(data)))
+        elif (function, header.sub_function) == (FUNCTION_BLOCK, SUBFUNCTION_LIST_BLOCK):
+            payload = self._list_blocks()
+        elif (function, header.sub_function) == (FUNCTION_BLOCK, SUBFUNCTION_LIST_BLOCKS_OF_TYPE):
+            payload = self._list_blocks_of_type(S7ListBlocksOfType(BinaryReader(data)).block_type)
+        elif (function, header.sub_function) == (FUNCTION_BLOCK, SUBFUNCTION_BLOCK_INFO):
+            info_request = S7BlockInfoRequest(BinaryReader(data))
+            payload = self._block_info(info_request.block_type, int(info_request.block_number))
+            if payload is None:
+                return self._user_data_response(request, function, header.sub_function, 0, YES_LAST_DATA_UNIT,
+                                                b'', ERROR_BLOCK_NOT_FOUND)
+        if payload is None:
+            return self._user_data_response(request, function, header.sub_function, 0, YES_LAST_DATA_UNIT,
+                                            b'', ERROR_NOT_IMPLEMENTED)
+
+        # Responses larger than the PDU are sent in fragments the client asks for one by one
+        chunk = max(1, self.pdu_size - USER_DATA_OVERHEAD)
+        if len(payload) <= chunk:
+            return self._user_data_response(request, function, header.sub_function, 0, YES_LAST_DATA_UNIT, payload)
+        sequence_num = self._next_sequence
+        self._next_sequence = self._next_sequence % 0xff + 1
+        self._fragments[sequence_num] = [payload[i:i + chunk] for i in range(0, len(payload), chunk)]
+        return self._fragment(request, function, header.sub_function, sequence_num)
+
+    def _fragment(self, request: S7Request, function: int, sub_function: int, sequence_num: int) -> BinaryWriter:
+        fragments = self._fragments.get(sequence_num)
+        if not fragments:
+            return self._user_data_response(request, function, sub_function, sequence_num, YES_LAST_DATA_UNIT,
+                                            b'', ERROR_NOT_IMPLEMENTED)
+        fragment = fragments.pop(0)
+        if not fragments:
+            del self._fragments[sequence_num]
+        return self._user_data_response(request, function, sub_function, sequence_num,
+                                        NOT_LAST_DATA_UNIT if fragments else YES_LAST_DATA_UNIT, fragment)
+
+    def _user_data_response(self, request: S7Request, function: int, sub_function: int, sequence_num: int,
+                            last_data_unit: int, payload: bytes, error_code: int = 0) -> BinaryWriter:
+        param = BinaryWriter()
+        param.write_struct(S7ParamUserData, {'param_head': b'\x00\x01\x12', 'internal_param_len': 8, 'method': 0x12,
+                                             'function': (FUNCTION_TYPE_RESPONSE << 4) | function,
+                                             'sub_function': sub_function, 'sequence_num': sequence_num,
+                                             'data_unit_ref_num': 0, 'last_data_unit': last_data_unit,
+                                             'error_code': error_code})
+        data = BinaryWriter()
+        data.write_struct(S7DataFragment, {'return_code': 0xff if not error_code else 0x0a,
+                                           'transport_size': 9 if not error_code else 0, 'length': len(payload)})
+        data.write(bytesbe(len(payload)), payload)
+        return self._header(request, ROSCTR_USER_DATA, param, data)
+
+    def _read_szl(self, request: DataStruct) -> bytes:
+        if request.szl_id not in self.cpu.szl:
+            return None
+        entry_len, entries = self.cpu.szl[request.szl_id]
+        bw = BinaryWriter()
+        bw.write_struct(S7Szl, {'szl_id': request.szl_id, 'szl_specific_index': request.szl_specific_index,
+                                'szl_entry_len': entry_len, 'szl_entries_count': len(entries)})
+        return bw.dump() + b''.join(entries)
+
+    def _list_blocks(self) -> bytes:
+        bw = BinaryWriter()
+        for block_type in BLOCK_TYPE_MAP:
+            count = sum(1 for code, _ in self.cpu.blocks if code == block_type)
+            bw.write_struct(S7ListBlocksEntry, {'block_type': block_type, 'block_count': count})
+        return bw.dump()
+
+    def _list_blocks_of_type(self, block_type: str) -> bytes:
+        bw = BinaryWriter()
+        for (code, num), data in sorted(self.cpu.blocks.items()):
+            if code == block_type:
+                # The MC7 header holds the block flags and language
+                bw.write_struct(S7ListBlocksOfTypeEntry, {'block_number': num, 'block_flags': data[3],
+                                                          'block_lang': data[4]})
+        return bw.dump()
+
+    def _block_info(self, block_type: str, num: int) -> bytes:
+        data = self.cpu.blocks.get((block_type, num))
+        if data is None:
+            return None
+        # The MC7 header and the footer fields, see forensic.analyzers.s7.mc7.mc7_parser
+        footer = data[-36:]
+        return _record(S7BlockInfo, {
+            'constant1': 1, 'block_type': int(block_type, 16), 'header': data[:2], 'unknown1': data[2],
+            'block_flags': data[3], 'block_lang': data[4], 'sub_block_type': data[5], 'block_number': num,
+            'load_memory_length': len(data), 'block_security': int.from_bytes(data[10:14], 'big'),
+            'code_timestamp': data[14:20], 'interface_timestamp': data[20:26],
+            'ssb_length': int.from_bytes(data[26:28], 'big'), 'add_length': int.from_bytes(data[28:30], 'big'),
+            'local_data_length': int.from_bytes(data[30:32], 'big'), 'mc7_length': int.from_bytes(data[32:34], 'big'),
+            'author': footer[:8].decode('ascii', 'replace').rstrip('\0'),
+            'family': footer[8:16].decode('ascii', 'replace').rstrip('\0'),
+            'name': footer[16:24].decode('ascii', 'replace').rstrip('\0'),
+            'version': footer[24], 'check_sum': int.from_bytes(footer[25:27], 'big')})
+
+
+class S7Emulator(object):
+    """Serves emulated CPUs keyed by the address they listen on"""
+
+    def __init__(self, cpus: Dict[str, EmulatedCpu], port: int = 102) -> None:
+        self.cpus = cpus
+        self.port = port
+        self._servers = []
+
+    async def start(self):
+        for host, cpu in self.cpus.items():
+            self._servers.append(await asyncio.start_server(
+                lambda reader, writer, cpu=cpu: self._serve(cpu, reader, writer), host, self.port))
+
+    async def close(self):
+        for server in self._servers:
+            server.close()
+            await server.wait_closed()
+        self._servers = []
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    @staticmethod
+    async def _read_tpkt(reader: asyncio.StreamReader) -> BinaryReader:
+        header = await reader.readexactly(TPKTLayer.get_size())
+        tpkt = TPKT().parse(BinaryReader(header))
+        return BinaryReader(await reader.readexactly(tpkt.real_length))
+
+    async def _serve(self, cpu: EmulatedCpu, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        if cpu.connections >= cpu.max_connections:
+            writer.close()
+            return
+
+        cpu.connections += 1
+        session = S7Session(cpu)
+        try:
+            response = session.connect(await self._read_tpkt(reader))
+            if response is None:
+                return
+            writer.write(response)
+            await writer.drain()
+
+            loop = asyncio.get_running_loop()
+            requests = 0
+            while True:
+                response = session.handle(await self._read_tpkt(reader))
+                if response is None:
+                    continue
+                requests += 1
+                if cpu.drop_every and requests % cpu.drop_every == 0:
+                    writer.transport.abort()
+                    return
+                # Requests pipelined by the client are delayed side by side, as over a long link
+                if cpu.latency:
+                    loop.call_later(cpu.latency, writer.write, response)
+                else:
+                    writer.write(response)
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            cpu.connections -= 1
+            writer.close()
+
+
+def emulated_hosts(count: int, first: str = '127.1.0.1') -> List[str]:
+    return [str(ipaddress.IPv4Address(first) + i) for i in range(count)]
+
+
+def emulate(count: int, blocks: int = 20, first: str = '127.1.0.1', **cpu_options) -> Dict[str, EmulatedCpu]:
+    """CPUs with distinct serial numbers and block contents"""
+    return {host: EmulatedCpu(corpora.mc7_blocks(blocks, seed), serial=f'S C-{seed:08d}', **cpu_options)
+            for seed, host in enumerate(emulated_hosts(count, first))}
+
+
+async def serve(args):
+    cpus = emulate(args.cpus, args.blocks, args.first, pdu_size=args.pdu_size, tpdu_size=args.tpdu_size,
+                   amq=args.amq, latency=args.latency, max_connections=args.max_connections,
+                   drop_every=args.drop_every)
+    async with S7Emulator(cpus, args.port):
+        hosts = list(cpus)
+        print(f'Serving {len(hosts)} S7 CPUs on port {args.port}: {hosts[0]} - {hosts[-1]}', flush=True)
+        await asyncio.Event().wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Emulate S7 CPUs on loopback addresses')
+    parser.add_argument('--cpus', type=int, default=1, help='Number of emulated CPUs, default 1')
+    parser.add_argument('--first', default='127.1.0.1', help='Address of the first CPU, default 127.1.0.1')
+    parser.add_argument('--port', type=int, default=102, help='Port of all the CPUs, default 102')
+    parser.add_argument('--blocks', type=int, default=20, help='Blocks held by each CPU, default 20')
+    parser.add_argument('--pdu_size', type=int, default=480, help='Max PDU size negotiated, default 480')
+    parser.add_argument('--tpdu_size', type=int, default=1024, help='Max COTP TPDU size, default 1024')
+    parser.add_argument('--amq', type=int, default=3, help='Max jobs outstanding per connection, default 3')
+    parser.add_argument('--latency', type=float, default=0.0, help='Seconds added before every response')
+    parser.add_argument('--max_connections', type=int, default=8, help='Connections a CPU accepts at once')
+    parser.add_argument('--drop_every', type=int, default=0, help='Requests after which a connection is reset')
+    args = parser.parse_args()
+    if resource is not None:
+        # A listening socket per CPU on top of their connections
+        soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
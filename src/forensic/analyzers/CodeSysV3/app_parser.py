@@ -7,7 +7,10 @@ from pathlib import Path
 from forensic.analyzers.CodeSysV3.file_format import CodesysV3FileFormat
 from forensic.analyzers.CodeSysV3.memory_dynamic_format import CodesysV3MemoryDynamicFormat
 from forensic.analyzers.CodeSysV3.memory_format import CodesysV3MemoryFormat
-from forensic.common.stream.stream import BinaryReader
+from forensic.common.stream.stream import BinaryReader, MappedFile
+
+# Files and directories written by dump_all into the app output directory
+APP_OUTPUTS = ['function_addresses.csv', 'symbols.csv', 'taskinfo.json', 'project_info.json', 'call_graph']
 
 
 def dump_all(output_dir, g_entry_point, symbols, all_code_blocks, taskinfos, project_info):
@@ -39,13 +42,12 @@ def dump_all(output_dir, g_entry_point, symbols, all_code_blocks, taskinfos, pro
 
 
 def parse_app(app_fpath, output_dir):
-    with open(app_fpath, 'rb') as f:
-        file_data = f.read()
+    with MappedFile(app_fpath) as file_data:
+        cff = CodesysV3FileFormat()
+        all_tags = cff.parse(file_data)
 
-    cff = CodesysV3FileFormat()
-    all_tags = cff.parse(file_data)
+        cmf = CodesysV3MemoryFormat(file_data, all_tags)
 
-    cmf = CodesysV3MemoryFormat(file_data, all_tags)
     br_memory = BinaryReader(cmf.memory_file)
 
     # Check if we have memory symbols
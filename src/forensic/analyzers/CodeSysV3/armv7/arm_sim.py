@@ -3,7 +3,7 @@ from collections import defaultdict
 import struct
 import capstone
 import networkx as nx
-from typing import Any, Tuple
+from typing import Any, Tuple, Type
 
 from forensic.common.stream.stream import *
 
@@ -48,6 +48,9 @@ class SparseBytesIO:
         self._pointer += num_bytes
         return bytes
 
+    def unpack(self, st: struct.Struct) -> tuple:
+        return st.unpack(self.read(st.size))
+
     def getvalue(self):
         return bytes(self._data.get(i, 0) for i in range(self._size))
 
@@ -60,6 +63,9 @@ class MemoryStream(BinaryReader, BinaryWriter):
     def read(self, basic_type: BasicType, dt_name=None, enable_check=True) -> Any:
         return super().read(basic_type, dt_name, False)
 
+    def read_struct(self, struct_class: Type[DataStruct], enable_check=True) -> dict:
+        return super().read_struct(struct_class, False)
+
 
 class ArmMachineSimulator:
     def __init__(self, memory_file: bytes, is_thumb=False):
@@ -19,6 +19,9 @@ class CS3BlockLogicCLI(AnalyzerCLI):
 
 
 class CS3BlockLogic(AnalyzerInterface):
+    inputs = ["CS3RawFileParser"]
+    outputs = ["CS3BlockLogic"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'CodeSysV3'
@@ -4,7 +4,7 @@ from typing import List
 
 from forensic.analyzers.CodeSysV3 import tag_handlers
 from forensic.analyzers.CodeSysV3.tag_handlers import CodesysBaseTag, CodesysUnknownTag, CodesysV3FileFormatAbstract
-from forensic.common.stream.stream import BinaryReader, ubyte, bytesbe, uint16be, uint16le, uint32le
+from forensic.common.stream.stream import BinaryReader, ubyte, uint16be, uint16le, uint32le
 
 '''TAG_LIST_OF_TAGS = 0x81
 TAG_APPLICATION_NAME = 0x10
@@ -52,21 +52,22 @@ class CodesysV3FileFormat(CodesysV3FileFormatAbstract):
     def read_tag(self, br: BinaryReader) -> CodesysBaseTag:
         tag_id = self.extract_tag_encoded_data(br)
         tag_size = self.extract_tag_encoded_data(br)
-        tag_data = br.read(bytesbe(tag_size))
+        tag_data = br.read_view(tag_size)
 
         return self.parse_tag(tag_id, tag_data)
 
-    def parse_tag(self, tag_id: int, tag_data: bytes) -> CodesysBaseTag:
+    def parse_tag(self, tag_id: int, tag_data: memoryview) -> CodesysBaseTag:
+        if tag_id in self._classes:
+            return self._classes[tag_id](self, tag_data)
+
+        # Only unknown tags keep their own copy, known tags parse the shared view
         tag = CodesysUnknownTag()
         tag.tid = tag_id
-        tag.data = tag_data
-
-        if tag_id in self._classes:
-            tag = self._classes[tag_id](self, tag_data)
+        tag.data = bytes(tag_data)
 
         return tag
 
-    def read_list_of_tags(self, tag_data: bytes) -> List[CodesysBaseTag]:
+    def read_list_of_tags(self, tag_data: memoryview) -> List[CodesysBaseTag]:
         tags = []
 
         br_data = BinaryReader(tag_data)
@@ -88,7 +89,7 @@ class CodesysV3FileFormat(CodesysV3FileFormatAbstract):
             section_size = br.read(uint32le)
             if some_size + 4 > 0x010:
                 br.read(uint32le)  # unk
-            data = br.read(bytesbe(section_size))
+            data = br.read_view(section_size)
 
             return handler_id, data
 
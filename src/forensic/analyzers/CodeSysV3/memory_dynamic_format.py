@@ -123,12 +123,7 @@ class CodesysV3MemoryDynamicFormat:
         self.g_entry_point = None
 
     def read_structs(self, br: BinaryReader, struct_class: Type[DataStruct], count: int) -> List[DataStruct]:
-        res = []
-
-        for _ in range(count):
-            res.append(br.read_struct(struct_class))
-
-        return res
+        return br.read_structs(struct_class, count)
 
     def get_key_by_value(self, d, value):
         for key, val in d.items():
@@ -162,15 +157,13 @@ class CodesysV3MemoryDynamicFormat:
         obj_struct['system_funcs'] = self.read_structs(br, CodesysLibSymbol, symbol_table_header['system_funcs_count'])
 
         current_offset = br.tell() - imp_addr['@table_start']
-        footer = br.read(bytesbe(symbol_table_header['size'] - current_offset))
-        fstrings = BinaryReader(footer)
+        fstrings = br.read(bytesbe(symbol_table_header['size'] - current_offset))
 
         for dtype, list_items in obj_struct.items():
             for item in list_items:
                 if 'table_offset' in item:
-                    fstrings.seek(item['table_offset'])
-                    sfound = fstrings.read(bytesbe(fstrings.remaining_data()))
-                    item['name'] = sfound[:sfound.find(b'\x00')].decode('ascii')
+                    name_end = fstrings.find(b'\x00', item['table_offset'])
+                    item['name'] = fstrings[item['table_offset']:name_end].decode('ascii')
 
         return obj_struct
 
@@ -1,7 +1,7 @@
 import os
 from pathlib import Path
 from forensic.interfaces.analyzer import AnalyzerInterface, AnalyzerCLI
-from forensic.analyzers.CodeSysV3.app_parser import parse_app
+from forensic.analyzers.CodeSysV3.app_parser import APP_OUTPUTS, parse_app
 
 
 class CS3RawFileParserCLI(AnalyzerCLI):
@@ -10,19 +10,38 @@ class CS3RawFileParserCLI(AnalyzerCLI):
 
 
 class CS3RawFileParser(AnalyzerInterface):
+    device_analysis = True
+    outputs = ["CS3RawFileParser"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'CodeSysV3'
         self.create_output_dir(self.plugin_name)
+        self.cache = self.open_cache()
 
     def analyze(self):
         raw_device_dir = self.output_dir.parent.joinpath('CS3RawFileParser')
         for device in os.listdir(raw_device_dir):
-            for app in os.listdir(os.path.join(raw_device_dir, device)):
-                for app_fname in os.listdir(os.path.join(raw_device_dir, device, app)):
-                    if app_fname.endswith(".app"):
-                        self.logger.info(f'Loading file: {app}')
-                        app_analyze_files_dir = Path(os.path.join(self.output_dir, device, app))
-                        app_analyze_files_dir.mkdir(parents=True, exist_ok=True)
-                        parse_app(os.path.join(raw_device_dir, device, app, app_fname), app_analyze_files_dir)
-                        self.logger.info(f'App: {app_fname} was analyzed and the results at: {app_analyze_files_dir}')
+            self.parse_device(raw_device_dir, device)
+
+    def analyze_device(self, ip: str):
+        self.parse_device(self.output_dir.parent.joinpath('CS3RawFileParser'), ip.replace(".", "_"))
+
+    def parse_device(self, raw_device_dir: Path, device: str):
+        for app in os.listdir(os.path.join(raw_device_dir, device)):
+            for app_fname in os.listdir(os.path.join(raw_device_dir, device, app)):
+                if app_fname.endswith(".app"):
+                    self.logger.info(f'Loading file: {app}')
+                    app_analyze_files_dir = Path(os.path.join(self.output_dir, device, app))
+                    app_analyze_files_dir.mkdir(parents=True, exist_ok=True)
+                    app_fpath = os.path.join(raw_device_dir, device, app, app_fname)
+                    digest = self.cache.digest_file(app_fpath)
+                    app_outputs = self.cache.get(digest)
+                    if app_outputs is None:
+                        parse_app(app_fpath, app_analyze_files_dir)
+                        self.cache.put(digest, self.cache.read_files(app_analyze_files_dir, APP_OUTPUTS))
+                        self.cache.commit()
+                    else:
+                        self.logger.info(f'App: {app_fname} is unchanged, reusing its cached results')
+                        self.cache.write_files(app_analyze_files_dir, app_outputs)
+                    self.logger.info(f'App: {app_fname} was analyzed and the results at: {app_analyze_files_dir}')
@@ -18,7 +18,8 @@ class CodesysV3FileFormatAbstract(ABC):
 class CodesysBaseTag(DataStruct):
     tid = dynamic
 
-    def _null_ending_bytes(self, data: bytes) -> bytes:
+    def _null_ending_bytes(self, data: memoryview) -> bytes:
+        data = bytes(data)
         return data[:data.find(b'\x00')]
 
 
@@ -1,7 +1,7 @@
 from forensic.common.stream.stream import DataStruct, uint16, uint32, bytesbe, ascii_string, dynamic
 
 
-class DatHeader(DataStruct):
+class DatHeader(DataStruct, compact=True):
     file_size = uint32
     unknown = uint32
     end_of_content_offset = uint32
@@ -11,7 +11,7 @@ class DatHeader(DataStruct):
     record_amount2 = uint32
 
 
-class RecordsHeader(DataStruct):
+class RecordsHeader(DataStruct, compact=True):
     signature = bytesbe(2)
     header_size = uint32
     unknown = uint32
@@ -21,7 +21,7 @@ class RecordsHeader(DataStruct):
     unknown3 = dynamic
 
 
-class Rung(DataStruct):
+class Rung(DataStruct, compact=True):
     signature = bytesbe(2)
     struct_size = uint32
     remaining_length = uint32
@@ -59,7 +59,7 @@ class Rung(DataStruct):
 #     variable_portion_size = uint32
 #     variable_portion = dynamic
 
-class Component(DataStruct):
+class Component(DataStruct, compact=True):
     signature = bytesbe(2)
     struct_size = uint32
     remaining_length = uint32
@@ -90,13 +90,13 @@ class Component(DataStruct):
     variable_portion = dynamic
 
 
-class UnknownRecord(DataStruct):
+class UnknownRecord(DataStruct, compact=True):
     signature = bytesbe(2)
     struct_size = uint32
     unknown = dynamic
 
 
-class RegionLink(DataStruct):
+class RegionLink(DataStruct, compact=True):
     flag = uint16
     user_flag = uint32
     region_id = uint32
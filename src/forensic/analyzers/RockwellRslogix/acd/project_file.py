@@ -4,7 +4,7 @@ from gzip import BadGzipFile
 from typing import Union
 from logging import Logger
 from collections.abc import Sequence
-from forensic.common.stream.stream import BinaryReader, uint32, bytesbe
+from forensic.common.stream.stream import BinaryReader, MappedFile, uint32, bytesbe
 from forensic.analyzers.RockwellRslogix.acd.dat_parser import DatHeader, RecordsHeader, Rung, Component, UnknownRecord, \
     RegionLink, Routine, component_types, Program, Controller
 
@@ -12,9 +12,8 @@ from forensic.analyzers.RockwellRslogix.acd.dat_parser import DatHeader, Records
 class ACDFile:
     def __init__(self, file_path: str, logger: Logger):
         self.logger = logger
-        acd_file = open(file_path, "rb")
-        self._acd_stream = BinaryReader(acd_file.read())
-        acd_file.close()
+        self._acd_file = MappedFile(file_path)
+        self._acd_stream = BinaryReader(self._acd_file.data)
 
         self._size = len(self._acd_stream)
         self._file_amount = 0
@@ -34,6 +33,18 @@ class ACDFile:
         self._initialize_rungs()
         self._initialize_region_links()
 
+    def close(self):
+        # Uncompressed files are views of the mapped archive, drop them before unmapping it
+        self.files = {}
+        self._acd_stream = None
+        self._acd_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
     def _read_footer(self):
         self._acd_stream.seek(-8, 2)
         self._file_amount = self._acd_stream.read(uint32)
@@ -53,11 +64,12 @@ class ACDFile:
             file_size = self._acd_stream.read(uint32)
             file_offset = self._acd_stream.read(uint32)
             self._acd_stream.seek(file_offset)
+            file_data = self._acd_stream.sub_reader(file_size)
             try:
-                self.files[file_name] = BinaryReader(gzip.decompress(self._acd_stream.read(bytesbe(file_size))))
+                self.files[file_name] = BinaryReader(gzip.decompress(file_data.read_view(file_size)))
             except BadGzipFile:
-                self._acd_stream.seek(file_offset)
-                self.files[file_name] = BinaryReader(self._acd_stream.read(bytesbe(file_size)))
+                file_data.seek(0)
+                self.files[file_name] = file_data
 
     def _initialize_components(self):
         comps_bs = self.files["comps.dat"]
@@ -124,8 +136,9 @@ class ACDFile:
         regnlink_bs.seek(records_header.first_record_offset)
         regnlink_header = RecordsHeader(regnlink_bs)
         regnlink_header.unknown3 = regnlink_bs.read(bytesbe(regnlink_header.header_size - 0x16))
-        while regnlink_bs.tell() < dat_header.end_of_content_offset:
-            region_link = RegionLink(regnlink_bs)
+        records_count = -(-(dat_header.end_of_content_offset - regnlink_bs.tell()) // RegionLink.get_size())
+        for values in regnlink_bs.read_structs(RegionLink, max(records_count, 0)):
+            region_link = RegionLink.from_values(values)
             self.region_links[region_link.uid] = region_link
 
     def component_get_parent_by_type(self, component: Component, component_type: Sequence,
@@ -16,6 +16,9 @@ class RockwellRslogixBlockLogicCLI(AnalyzerCLI):
 
 
 class RockwellRslogixBlockLogic(AnalyzerInterface):
+    inputs = ["RockwellRslogixRawFileParser"]
+    outputs = ["RockwellRslogixBlockLogic"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'RockwellRslogix'
@@ -17,6 +17,9 @@ class RockwellRslogixOnlineOfflineCompareCLI(AnalyzerCLI):
 
 
 class RockwellRslogixOnlineOfflineCompare(AnalyzerInterface):
+    inputs = ["RockwellRslogixRawFileParser"]
+    outputs = ["RockwellRslogixOnlineOfflineCompare"]
+
     def __init__(self, config: AnalyzerConfig, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'RockwellRslogix'
@@ -42,8 +45,8 @@ class RockwellRslogixOnlineOfflineCompare(AnalyzerInterface):
         online_data = self.get_device_data(ip)
         if not online_data:
             raise Exception(f'No programs to compare were found for given ip: {ip}')
-        acd_file = ACDFile(project_file, self.logger)
-        offline_data = acd_file.get_controller()
+        with ACDFile(project_file, self.logger) as acd_file:
+            offline_data = acd_file.get_controller()
         compared_routines = self.compare_routines_from_projects(online_data, offline_data)
         self.export_compare_results(ip, project_file, compared_routines, self.output_dir)
 
@@ -11,10 +11,14 @@ class RockwellRslogixRawFileParserCLI(AnalyzerCLI):
 
 
 class RockwellRslogixRawFileParser(AnalyzerInterface):
+    device_analysis = True
+    outputs = ["RockwellRslogixRawFileParser"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'RockwellRslogix'
         self.create_output_dir(self.plugin_name)
+        self.cache = self.open_cache()
 
     @staticmethod
     def _get_calling_task_by_program_instance(tasks: list, program_instance: int) -> str:
@@ -50,10 +54,24 @@ class RockwellRslogixRawFileParser(AnalyzerInterface):
     def analyze(self):
         raw_device_dir = self.output_dir.parent.joinpath('RockwellRslogixRawFileParser')
         for device_ip_str in os.listdir(raw_device_dir):
-            device_ip = device_ip_str.replace('_', '.')
-            device_output_dir = os.path.join(raw_device_dir, device_ip_str)
-            self.logger.info('Loading file: ' + os.path.join(device_output_dir, device_ip_str + '.json'))
+            self.parse_device(raw_device_dir, device_ip_str)
+
+    def analyze_device(self, ip: str):
+        self.parse_device(self.output_dir.parent.joinpath('RockwellRslogixRawFileParser'), ip.replace(".", "_"))
+
+    def parse_device(self, raw_device_dir: Path, device_ip_str: str):
+        device_ip = device_ip_str.replace('_', '.')
+        device_output_dir = os.path.join(raw_device_dir, device_ip_str)
+        self.logger.info('Loading file: ' + os.path.join(device_output_dir, device_ip_str + '.json'))
+        digest = self.cache.digest_file(os.path.join(device_output_dir, device_ip_str + '.json'))
+        device_outputs = self.cache.get(digest)
+        if device_outputs is None:
             with open(os.path.join(device_output_dir, device_ip_str + '.json'), 'r') as f:
                 device_output = json.load(f)
             self._parse_project_flow(device_output_dir, device_output)
-            self.logger.info(f'The device: {device_ip} was analyzed and the results at: {raw_device_dir}')
+            self.cache.put(digest, self.cache.read_files(device_output_dir, ["call_graph"]))
+            self.cache.commit()
+        else:
+            self.logger.info(f'The device: {device_ip} is unchanged, reusing its cached results')
+            self.cache.write_files(device_output_dir, device_outputs)
+        self.logger.info(f'The device: {device_ip} was analyzed and the results at: {raw_device_dir}')
@@ -25,6 +25,9 @@ class S7BlockLogicCLI(AnalyzerCLI):
 
 
 class S7BlockLogic(AnalyzerInterface):
+    inputs = ["S7RawFileParser"]
+    outputs = ["S7BlockLogic"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'S7'
@@ -69,6 +72,9 @@ class S7BlockLogic(AnalyzerInterface):
             return parsed_data
         device_dir = self.output_dir.parent.joinpath('S7RawFileParser')
         for device in os.listdir(device_dir):
+            # The directory also holds the raw artifacts of the devices
+            if not device.endswith('.json'):
+                continue
             self.logger.info(f'Loading file: {device}')
             with open(device_dir.joinpath(device), 'r') as f:
                 device_output = json.load(f)
@@ -425,7 +431,7 @@ class S7BlockLogic(AnalyzerInterface):
 
     def author_check(self, df, ip_addresses):
         self.logger.debug('executing block author check')
-        agg_ips = df.groupby('author_name')['ip', 'author_name'].agg(['unique'])
+        agg_ips = df.groupby('author_name')[['ip', 'author_name']].agg(['unique'])
         author_names = list(map(lambda e: e[0], agg_ips[('author_name', 'unique')]))
         unique_ips = list(map(lambda e: e, agg_ips[('ip', 'unique')]))
         author_plcs_amount = dict.fromkeys(author_names)
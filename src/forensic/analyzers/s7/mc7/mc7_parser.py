@@ -1,4 +1,3 @@
-import binascii
 import struct
 import datetime
 import socket
@@ -68,6 +67,7 @@ class BlockFooterMetadata(DataStruct):
 class MC7Parser(object):
     def __init__(self):
         self._aggregated_buffer = dict()
+        self._raw_buffer = dict()
 
     @staticmethod
     def _to_version(data):
@@ -86,6 +86,10 @@ class MC7Parser(object):
         length = br.read(basic_type)
         return br.read(ascii_string(length))
 
+    def _read_raw(self, br: BinaryReader, name: str, length: int):
+        self._raw_buffer[name] = br.read_view(length)
+        self._aggregated_buffer[name] = self._raw_buffer[name].hex()
+
     @staticmethod
     def read_s7_datetime_from_bytes(date_byte):
         millis = struct.unpack(">I", date_byte[:4])[0]
@@ -136,13 +140,13 @@ class MC7Parser(object):
         self._aggregated_buffer["local_data_length"] = db_block_metadata.local_data_length
         self._aggregated_buffer["data_length"] = db_block_metadata.data_length
         if self._aggregated_buffer["data_length"]:
-            self._aggregated_buffer["data"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["data_length"]))).decode()
+            self._read_raw(br, "data", self._aggregated_buffer["data_length"])
         if self._aggregated_buffer["segment_length"]:
-            self._aggregated_buffer["segment"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["segment_length"]))).decode()
+            self._read_raw(br, "segment", self._aggregated_buffer["segment_length"])
         if self._aggregated_buffer["local_data_length"]:
-            self._aggregated_buffer["local_data"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["local_data_length"]))).decode()
+            self._read_raw(br, "local_data", self._aggregated_buffer["local_data_length"])
         if self._aggregated_buffer["body_length"]:
-            self._aggregated_buffer["body"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["body_length"]))).decode()
+            self._read_raw(br, "body", self._aggregated_buffer["body_length"])
 
     def parse_non_db_block_metadata(self, br: BinaryReader):
         non_db_block_metadata = NonDbBlockMetadata(br)
@@ -151,16 +155,16 @@ class MC7Parser(object):
         self._aggregated_buffer["local_data_length"] = non_db_block_metadata.local_data_length
         self._aggregated_buffer["mc7_length"] = non_db_block_metadata.mc7_length
         if self._aggregated_buffer["mc7_length"]:
-            self._aggregated_buffer["data"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["mc7_length"]))).decode()
+            self._read_raw(br, "data", self._aggregated_buffer["mc7_length"])
         if self._aggregated_buffer["interface_length"]:
-            self._aggregated_buffer["interface"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["interface_length"]))).decode()
+            self._read_raw(br, "interface", self._aggregated_buffer["interface_length"])
         if self._aggregated_buffer["segment_length"]:
-            self._aggregated_buffer["segment"] = binascii.hexlify(br.read(bytesbe(self._aggregated_buffer["segment_length"]))).decode()
+            self._read_raw(br, "segment", self._aggregated_buffer["segment_length"])
 
     def parse_non_db_block_segement(self):
         self._aggregated_buffer["used_block"] = []
         if self._aggregated_buffer["segment"]:
-            segment_br = BinaryReader(binascii.unhexlify(self._aggregated_buffer["segment"]))
+            segment_br = BinaryReader(self._raw_buffer["segment"])
             self._aggregated_buffer["segment_num"] = segment_br.read(uint16)
             pointer = 0
             for x in range(0, self._aggregated_buffer["segment_num"]):
@@ -187,12 +191,12 @@ class MC7Parser(object):
         if self._aggregated_buffer['type'] == 'DB' and self._aggregated_buffer['data_length']:
             self._aggregated_buffer["db_ext_header"] = dict()
             if self._aggregated_buffer["block_name"] == "TCON_PAR":  # S7-300/400 only
-                self.parse_tcon_params(BinaryReader(binascii.unhexlify(self._aggregated_buffer["data"])))
+                self.parse_tcon_params(BinaryReader(self._raw_buffer["data"]))
 
     def parse_db_block_body(self):
         data_struct = []
-        actual_values = BinaryReader(binascii.unhexlify(self._aggregated_buffer["data"]))
-        db_data = BinaryReader(binascii.unhexlify(self._aggregated_buffer["body"]))
+        actual_values = BinaryReader(self._raw_buffer["data"])
+        db_data = BinaryReader(self._raw_buffer["body"])
         db_type = db_data.read(ubyte)
         fb_num = db_data.read(uint16)
         if db_type == 0xa:
@@ -202,7 +206,7 @@ class MC7Parser(object):
             self._aggregated_buffer['db_type'] = 'GlobalDB'
         interface_len = db_data.read(uint16)
         value_position = db_data.read(uint16)
-        start_values = BinaryReader(binascii.unhexlify(self._aggregated_buffer["body"])[interface_len + 7:])
+        start_values = BinaryReader(self._raw_buffer["body"][interface_len + 7:])
         try:
             while db_data.tell() <= (interface_len + 5) and start_values.tell() <= value_position:
                 interface = self._get_interface_val(db_data, start_values, actual_values)
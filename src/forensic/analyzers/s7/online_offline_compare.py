@@ -5,6 +5,7 @@ import json
 import pandas as pd
 from pathlib import Path
 from forensic.interfaces.analyzer import AnalyzerInterface, AnalyzerCLI
+from forensic.common.stream.stream import MappedFile
 
 
 class S7OnlineOfflineCompareCLI(AnalyzerCLI):
@@ -15,6 +16,9 @@ class S7OnlineOfflineCompareCLI(AnalyzerCLI):
 
 
 class S7OnlineOfflineCompare(AnalyzerInterface):
+    inputs = ["S7RawFileParser"]
+    outputs = ["S7OnlineOfflineCompare"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'S7'
@@ -89,17 +93,15 @@ class S7OnlineOfflineCompare(AnalyzerInterface):
     def extract_offset(blocks_data, offset):
         if offset:
             offset = int(offset)
-            padding = struct.unpack('<H', blocks_data[offset * 512 + 2:offset * 512 + 4])[0]
-            size = struct.unpack('<I', blocks_data[offset * 512 + 4:offset * 512 + 8])[0]
+            padding, size = struct.unpack_from('<HI', blocks_data, offset * 512 + 2)
             return blocks_data[offset * 512 + 8:offset * 512 + 8 + size - padding]
         return b''
 
     def extract_blocks(self, path):
         res = []
         if os.path.exists(os.path.join(path, 'SUBBLK.DBT')) and os.path.join(path, 'SUBBLK.DBF'):
-            with open(os.path.join(path, 'SUBBLK.DBT'), 'rb') as f:
-                blocks_data = f.read()
-            with open(os.path.join(path, 'SUBBLK.DBF'), 'rb') as f:
+            with MappedFile(os.path.join(path, 'SUBBLK.DBT')) as blocks_data, \
+                    open(os.path.join(path, 'SUBBLK.DBF'), 'rb') as f:
                 f.read(833)
                 data = f.read(192)
                 while len(data) == 192:
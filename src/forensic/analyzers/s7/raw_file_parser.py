@@ -3,6 +3,7 @@ import json
 from pathlib import Path
 from base64 import b64decode
 from forensic.interfaces.analyzer import AnalyzerInterface, AnalyzerCLI
+from forensic.common.artifacts.artifacts import ArtifactStore
 from forensic.analyzers.s7.mc7.mc7_parser import MC7Parser
 from forensic.common.stream.stream import StreamNotEnoughData
 from forensic.plugins.s7.s7_szl import SZL_INDEX_NAMES
@@ -14,17 +15,37 @@ class S7RawFileParserCLI(AnalyzerCLI):
 
 
 class S7RawFileParser(AnalyzerInterface):
+    device_analysis = True
+    outputs = ["S7RawFileParser"]
+
     def __init__(self, config, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.plugin_name = 'S7'
         self.create_output_dir(self.plugin_name)
+        self.cache = self.open_cache()
 
-    def parse_blocks(self, parsed_slot_rack, blocks):
+    def parse_blocks(self, parsed_slot_rack, blocks, store: ArtifactStore):
         for block_name, block in blocks.items():
-            try:
-                parsed_slot_rack["blocks"].append(MC7Parser().parse(b64decode(block["data"].encode())))
-            except StreamNotEnoughData:
-                self.logger.error(f'Stream not enough data for block: {block_name}')
+            # Blocks of artifact indexes are only read from their blob when they are not cached already
+            if "digest" in block:
+                data, digest = None, block["digest"]
+            elif "data" in block:
+                data = b64decode(block["data"].encode())
+                digest = self.cache.digest(data)
+            else:
+                self.logger.warning(f'No data for block: {block_name}')
+                continue
+            parsed_block = self.cache.get(digest)
+            if parsed_block is None:
+                if data is None:
+                    data = store.read_blob(digest)
+                try:
+                    parsed_block = MC7Parser().parse(data)
+                except StreamNotEnoughData:
+                    self.logger.error(f'Stream not enough data for block: {block_name}')
+                    continue
+                self.cache.put(digest, parsed_block)
+            parsed_slot_rack["blocks"].append(parsed_block)
 
     def parse_szl(self, parsed_slot_rack, szl_values):
         for szl_id, szl_value_list in szl_values.items():
@@ -41,18 +62,44 @@ class S7RawFileParser(AnalyzerInterface):
 
     def analyze(self):
         device_dir = self.output_dir.parent.joinpath('S7RawFileParser')
-        for device in os.listdir(device_dir):
-            parsed_device = []
-            self.logger.info(f'Loading file: {device}')
-            with open(device_dir.joinpath(device), 'r') as f:
-                device_output = json.load(f)
-            parsed_slot_rack = dict()
-            for slot_rack in device_output:
-                parsed_slot_rack = {"slot": slot_rack["slot"], "rack": slot_rack["rack"], "identity": dict(),
-                                    "blocks": []}
-                self.parse_szl(parsed_slot_rack, slot_rack["szl"])
-                self.parse_blocks(parsed_slot_rack, slot_rack["blocks"])
-            if parsed_slot_rack:
-                parsed_device.append(parsed_slot_rack)
-            with open(self.output_dir.joinpath(device), 'w') as f:
-                json.dump(parsed_device, f, indent=4, default=str)
+        devices = os.listdir(device_dir)
+        for device in devices:
+            # Raw JSON files of older exports are parsed as long as there is no artifact index for the device
+            if device.endswith(ArtifactStore.INDEX_SUFFIX) or \
+                    (device.endswith('.json') and f'{Path(device).stem}{ArtifactStore.INDEX_SUFFIX}' not in devices):
+                self.parse_device(device_dir, device)
+
+    def analyze_device(self, ip: str):
+        device_dir = self.output_dir.parent.joinpath('S7RawFileParser')
+        device = f'{ip.replace(".", "_")}{ArtifactStore.INDEX_SUFFIX}'
+        self.parse_device(device_dir, device if device_dir.joinpath(device).is_file() else f'{Path(device).stem}.json')
+
+    @staticmethod
+    def read_device(store: ArtifactStore, device: str):
+        if not device.endswith(ArtifactStore.INDEX_SUFFIX):
+            with open(store.root.joinpath(device), 'r') as f:
+                return json.load(f)
+        slot_racks = {}
+        for record in store.read_index(Path(device).stem):
+            if "block" in record:
+                slot_racks[(record["rack"], record["slot"])]["blocks"][record.pop("block")] = record
+            else:
+                slot_racks[(record["rack"], record["slot"])] = {**record, "blocks": {}}
+        return list(slot_racks.values())
+
+    def parse_device(self, device_dir: Path, device: str):
+        parsed_device = []
+        self.logger.info(f'Loading file: {device}')
+        store = ArtifactStore(device_dir)
+        device_output = self.read_device(store, device)
+        parsed_slot_rack = dict()
+        for slot_rack in device_output:
+            parsed_slot_rack = {"slot": slot_rack["slot"], "rack": slot_rack["rack"], "identity": dict(),
+                                "blocks": []}
+            self.parse_szl(parsed_slot_rack, slot_rack["szl"])
+            self.parse_blocks(parsed_slot_rack, slot_rack["blocks"], store)
+        if parsed_slot_rack:
+            parsed_device.append(parsed_slot_rack)
+        with open(self.output_dir.joinpath(f'{Path(device).stem}.json'), 'w') as f:
+            json.dump(parsed_device, f, indent=4, default=str)
+        self.cache.commit()
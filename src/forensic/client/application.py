@@ -3,12 +3,25 @@ import forensic.common.constants.constants as constants
 from forensic.common.constants.constants import Parallelism
 from forensic.common.logger.logger import LoggerHandler
 from forensic.interfaces.plugin import PluginConfig
+from forensic.common.dag.dag import DependencyGraph
+from forensic.interfaces.analyzer import AnalyzerConfig
 import forensic.plugins
 import forensic.analyzers
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from multiprocessing import Pool
 from pathlib import Path
 from typing import List
 
+# Analyzers are created once per pipeline worker process and reused for every device
+_device_analyzers = {}
+
+
+def _analyze_device(configs: List[AnalyzerConfig], output_dir: Path, verbose: bool, ip: str):
+    for config in configs:
+        if config.name not in _device_analyzers:
+            _device_analyzers[config.name] = forensic.__resources__[config.name](config, output_dir, verbose)
+        _device_analyzers[config.name].run_device(ip)
+
 
 class Application(object):
     def __init__(self):
@@ -20,13 +33,65 @@ class Application(object):
 
     def execute_by_config(self, configs: List[PluginConfig]):
         if constants.PARALLELISM == constants.Parallelism.MULTIPROCESSING:
+            # Plugins running side by side share the connection budget
+            for config in configs:
+                if isinstance(config, PluginConfig):
+                    config.parameters.setdefault("max_connections", max(1, constants.MAX_CONNECTIONS // len(configs)))
             with Pool(processes=len(configs)) as p:
                 p.starmap(self._exec, [(config, ) for config in configs])
         elif constants.PARALLELISM == constants.Parallelism.OFF:
             for config in configs:
                 self._exec(config)
 
-    def scan(self, config: List[PluginConfig], multiprocess: bool = False, output_dir: Path = None, verbose:Path = None):
+    def execute_analyzers(self, configs: List[AnalyzerConfig]):
+        graph = DependencyGraph.from_analyzers(forensic.analyzers.__analyzers__)
+        names = [config.name for config in configs]
+        order = graph.sort(names)
+        if constants.PARALLELISM == constants.Parallelism.OFF:
+            for index in order:
+                self._exec(configs[index])
+            return
+        # Analyzers are started as soon as the analyzers producing their inputs are done
+        dependencies = graph.select(names)
+        done = set()
+        running = {}
+        with ProcessPoolExecutor(max_workers=len(configs)) as executor:
+            while len(done) < len(configs):
+                for index, config in enumerate(configs):
+                    if index not in done and index not in running.values() and dependencies[index] <= done:
+                        running[executor.submit(self._exec, config)] = index
+                finished, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    done.add(running.pop(future))
+                    future.result()
+
+    def execute_pipeline(self, configs: List[PluginConfig]):
+        for config in configs:
+            plugin = forensic.__resources__[config.name](config, constants.OUTPUT_DIR, constants.VERBOSE)
+            analyzers_config = config.analyzers or [AnalyzerConfig(name, config.parameters)
+                                                    for name in plugin.default_analyzers]
+            device_configs = [c for c in analyzers_config if forensic.__resources__[c.name].device_analysis]
+            # Each device goes through its analyzers one after the other, the producers of their inputs first
+            graph = DependencyGraph.from_analyzers(forensic.analyzers.__analyzers__)
+            device_configs = [device_configs[index] for index in graph.sort([c.name for c in device_configs])]
+            fleet_configs = [c for c in analyzers_config if not forensic.__resources__[c.name].device_analysis]
+            # Devices are parsed on worker processes while the acquisition of the others goes on
+            with ProcessPoolExecutor() as executor:
+                futures = []
+
+                def on_device(result):
+                    for ip in result:
+                        futures.append(executor.submit(_analyze_device, device_configs, constants.OUTPUT_DIR,
+                                                       constants.VERBOSE, ip))
+                plugin.run(on_device if device_configs else None)
+                for future in wait(futures).done:
+                    future.result()
+            # Analyzers comparing the devices to each other need all of them parsed
+            if fleet_configs:
+                self.execute_analyzers(fleet_configs)
+
+    def scan(self, config: List[PluginConfig], multiprocess: bool = False, output_dir: Path = None, verbose:Path = None,
+             pipeline: bool = False):
         try:
             if verbose:
                 constants.VERBOSE = verbose
@@ -37,11 +102,15 @@ class Application(object):
             if multiprocess:
                 constants.PARALLELISM = Parallelism.MULTIPROCESSING
                 self.logger.info("Enabled multiprocessing")
-            if config:
+            if config and pipeline:
+                self.logger.info("Started pipeline...")
+                self.execute_pipeline(config)
+                self.logger.info("Finished pipeline...")
+            elif config:
                 analyzers_config = PluginConfig.get_analyzers_config(config)
                 if analyzers_config:
                     self.logger.info("Started analyzing...")
-                    self.execute_by_config(analyzers_config)
+                    self.execute_analyzers(analyzers_config)
                     self.logger.info("Finished analyzing...")
                 else:
                     self.logger.info("Started scanning...")
@@ -32,6 +32,10 @@ class ForensicCLI(Application):
                                  "--multiprocess",
                                  help="Number of processes to run when in use with multiple plugins/analyzers",
                                  action='store_true')
+        self.parser.add_argument("-l",
+                                 "--pipeline",
+                                 help="Analyze each device as soon as it is acquired, while the others are still scanned",
+                                 action='store_true')
         self.parser.add_argument("-o",
                                  "--output-dir",
                                  help=f"Directory in which to output any generated files, default is {constants.OUTPUT_DIR}",
@@ -66,7 +70,7 @@ class ForensicCLI(Application):
         args = self.parser.parse_args()
         if args.config:
             config = PluginConfig.read_config_file(args.config)
-            super().scan(config, args.multiprocess, args.output_dir, args.verbose)
+            super().scan(config, args.multiprocess, args.output_dir, args.verbose, args.pipeline)
         if args.plugin:
             addresses = None
             if args.ip:
@@ -75,9 +79,10 @@ class ForensicCLI(Application):
             analyzers = []
             if args.analyzer:
                 analyzers = [AnalyzerConfig(args.analyzer, parameters)]
-                parameters = dict()
+                if not args.pipeline:
+                    parameters = dict()
             plugin_config = PluginConfig(args.plugin, addresses, args.port, args.transport, parameters, analyzers)
             if args.save_config:
                 plugin_config.create_config_file(constants.CONFIG_FILE)
                 self.logger.info("Successfully created config.json file")
-            super().scan([plugin_config], args.multiprocess, args.output_dir, args.verbose)
+            super().scan([plugin_config], args.multiprocess, args.output_dir, args.verbose, args.pipeline)
@@ -8,5 +8,6 @@ class ForensicClient(Application):
     def __init__(self):
         super().__init__()
 
-    def scan(self, config: List[PluginConfig], multiprocess: bool = False, output_dir: Path = None, verbose:Path = None):
-        super().scan(config, multiprocess, output_dir, verbose)
\ No newline at end of file
+    def scan(self, config: List[PluginConfig], multiprocess: bool = False, output_dir: Path = None, verbose:Path = None,
+             pipeline: bool = False):
+        super().scan(config, multiprocess, output_dir, verbose, pipeline)
\ No newline at end of file
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator
+from forensic.common.stream.stream import MappedFile
+
+
+class RecordJournal(object):
+    """Appends JSON Lines records, each one synced to disk before write returns so an interruption loses none."""
+
+    def __init__(self, path: Path, default: Callable = None) -> None:
+        self.path = Path(path)
+        self.default = default
+        self._lock = threading.Lock()
+        self._file = open(self.path, 'a')
+
+    def write(self, record: Dict):
+        line = json.dumps(record, default=self.default, separators=(',', ':'))
+        with self._lock:
+            self._file.write(line + '\n')
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ArtifactStore(object):
+    """Device artifacts: binary blobs addressed by their SHA-256 and JSON Lines indexes describing them."""
+
+    BLOBS_DIR = 'blobs'
+    INDEX_SUFFIX = '.jsonl'
+    JOURNAL_SUFFIX = '.jsonl.part'
+
+    def __init__(self, root: Path) -> None:
+        self.root = Path(root)
+        self.blobs_dir = self.root.joinpath(self.BLOBS_DIR)
+
+    def blob_path(self, digest: str) -> Path:
+        return self.blobs_dir.joinpath(digest[:2], digest)
+
+    def put_blob(self, data: bytes, sync: bool = False) -> str:
+        """With sync the blob is on disk when this returns, before a journal record referencing it is written"""
+        digest = hashlib.sha256(data).hexdigest()
+        blob_path = self.blob_path(digest)
+        # Blobs shared by several devices are written once, renamed into place so readers never see partial data
+        if not blob_path.exists():
+            blob_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=blob_path.parent)
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+                if sync:
+                    f.flush()
+                    os.fsync(f.fileno())
+            os.replace(tmp_path, blob_path)
+        return digest
+
+    def read_blob(self, digest: str) -> bytes:
+        with open(self.blob_path(digest), 'rb') as f:
+            return f.read()
+
+    def map_blob(self, digest: str) -> MappedFile:
+        return MappedFile(self.blob_path(digest))
+
+    def index_path(self, name: str) -> Path:
+        return self.root.joinpath(f'{name}{self.INDEX_SUFFIX}')
+
+    def write_index(self, name: str, records: Iterable[Dict], default: Callable = None):
+        self.root.mkdir(parents=True, exist_ok=True)
+        # Renamed into place so an interrupted write leaves the previous index intact
+        fd, tmp_path = tempfile.mkstemp(dir=self.root)
+        with os.fdopen(fd, 'w') as f:
+            for record in records:
+                f.write(json.dumps(record, default=default, separators=(',', ':')))
+                f.write('\n')
+        os.replace(tmp_path, self.index_path(name))
+
+    def read_index(self, name: str) -> Iterator[Dict]:
+        with open(self.index_path(name), 'r') as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+    def journal_path(self, name: str) -> Path:
+        return self.root.joinpath(f'{name}{self.JOURNAL_SUFFIX}')
+
+    def open_journal(self, name: str, default: Callable = None) -> RecordJournal:
+        """Records of an acquisition in progress, appended to those left by an interrupted one"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        return RecordJournal(self.journal_path(name), default)
+
+    def read_journal(self, name: str) -> Iterator[Dict]:
+        if not self.journal_path(name).is_file():
+            return
+        with open(self.journal_path(name), 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # The last record of an interrupted journal may be cut short
+                    break
+                yield record
+
+    def remove_journal(self, name: str):
+        self.journal_path(name).unlink(missing_ok=True)
@@ -0,0 +1,84 @@
+import hashlib
+import json
+import os
+import sqlite3
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional
+
+
+class AnalysisCache(object):
+    """Persistent analyzer results keyed by the SHA-256 of their input and the analyzer version."""
+
+    def __init__(self, cache_file: Path, version: int) -> None:
+        self.cache_file = cache_file
+        self.version = version
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        # Connected on first use, each process running the analyzer has its own connection
+        if self._conn is None:
+            self.cache_file.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(self.cache_file, timeout=60)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS results "
+                               "(digest TEXT NOT NULL, version INTEGER NOT NULL, value TEXT NOT NULL, "
+                               "PRIMARY KEY (digest, version))")
+        return self._conn
+
+    @staticmethod
+    def digest(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def digest_file(file_path) -> str:
+        sha256 = hashlib.sha256()
+        with open(file_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha256.update(chunk)
+        return sha256.hexdigest()
+
+    def get(self, digest: str) -> Optional[Any]:
+        row = self._connect().execute("SELECT value FROM results WHERE digest = ? AND version = ?",
+                                      (digest, self.version)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, digest: str, value: Any):
+        self._connect().execute("INSERT OR REPLACE INTO results VALUES (?, ?, ?)",
+                                (digest, self.version, json.dumps(value, default=str)))
+
+    def commit(self):
+        if self._conn is not None:
+            self._conn.commit()
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.commit()
+            self._conn.close()
+            self._conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    @staticmethod
+    def read_files(directory, names: Iterable[str]) -> Dict[str, str]:
+        """Reads the named output files and directories under directory, keyed by their relative path"""
+        files = {}
+        for name in names:
+            path = os.path.join(directory, name)
+            paths = [path] if os.path.isfile(path) else \
+                [os.path.join(root, file_name) for root, _, file_names in os.walk(path) for file_name in file_names]
+            for file_path in paths:
+                with open(file_path, 'r', newline='') as f:
+                    files[os.path.relpath(file_path, directory).replace(os.sep, '/')] = f.read()
+        return files
+
+    @staticmethod
+    def write_files(directory, files: Dict[str, str]):
+        for relative_path, content in files.items():
+            file_path = Path(directory).joinpath(*relative_path.split('/'))
+            file_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(file_path, 'w', newline='') as f:
+                f.write(content)
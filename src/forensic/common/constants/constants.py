@@ -19,8 +19,28 @@ LOGS_DIR = 'Logs'
 LOG_FILE_NAME = 'Application.log'
 LOGS_FORMATTER = '%(asctime)s | %(levelname)s | %(message)s'
 
+# Devices acquired concurrently on the event loop, and threads for plugins with blocking clients
+ASYNC_WORKERS = 1000
+THREAD_WORKERS = 30
+
+# Default connection budget of a plugin run, overridden through the plugin parameters
+MAX_CONNECTIONS = 256
+MAX_DEVICE_CONNECTIONS = 4
+SUBNET_PREFIX = 24
+SUBNET_RATE = 0
+
+# Discovery connect timeouts adapt to the measured round trips within these bounds
+SCAN_INITIAL_TIMEOUT = 1.0
+SCAN_MIN_TIMEOUT = 0.1
+SCAN_MAX_TIMEOUT = 3.0
+SCAN_RETRIES = 1
+
 OUTPUT_DIR = Path('Output')
+# Analysis results reused across runs, kept next to the analyzers' output directories of each plugin
+CACHE_DIR = '.cache'
+# Work completed by a plugin run, kept in its output directory until the run finishes, see --resume
+SWEEP_JOURNAL = 'sweep.jsonl'
 CONFIG_FILE = Path('config.json')
 
-ARGUMENTS = ['config', 'ip', 'output_dir', 'port', 'multiprocess', 'transport', 'verbose', 'plugin', 'analyzer', 'save_config']
+ARGUMENTS = ['config', 'ip', 'output_dir', 'port', 'multiprocess', 'transport', 'verbose', 'plugin', 'analyzer', 'save_config', 'pipeline']
 
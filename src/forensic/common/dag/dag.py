@@ -0,0 +1,58 @@
+from collections import defaultdict
+from typing import Dict, Iterable, List, Set
+
+
+class DependencyCycle(Exception):
+    pass
+
+
+class DependencyGraph(object):
+    """Orders nodes by the artifacts they read and write, inputs nobody writes are expected to exist already."""
+
+    def __init__(self) -> None:
+        self._inputs = {}
+        self._producers = defaultdict(set)
+
+    @staticmethod
+    def from_analyzers(analyzers: Dict) -> "DependencyGraph":
+        graph = DependencyGraph()
+        for name, analyzer in analyzers.items():
+            graph.add(name, analyzer.inputs, analyzer.outputs)
+        return graph
+
+    def add(self, name: str, inputs: Iterable[str], outputs: Iterable[str]):
+        self._inputs[name] = set(inputs)
+        for output in outputs:
+            self._producers[output].add(name)
+
+    def dependencies(self, name: str) -> Set[str]:
+        dependencies = set()
+        for artifact in self._inputs.get(name, ()):
+            dependencies |= self._producers[artifact]
+        dependencies.discard(name)
+        return dependencies
+
+    def select(self, names: List[str]) -> List[Set[int]]:
+        """Returns the dependencies of each selected node as indexes into names"""
+        indexes = defaultdict(set)
+        for index, name in enumerate(names):
+            indexes[name].add(index)
+        selected = []
+        for name in names:
+            selected.append(set().union(*(indexes[dependency] for dependency in self.dependencies(name))))
+        return selected
+
+    def sort(self, names: List[str]) -> List[int]:
+        """Returns the indexes of names in an order where every node comes after its dependencies"""
+        dependencies = self.select(names)
+        order = []
+        done = set()
+        while len(order) < len(names):
+            ready = [index for index in range(len(names))
+                     if index not in done and dependencies[index] <= done]
+            if not ready:
+                raise DependencyCycle(f"Cyclic dependencies between: "
+                                      f"{', '.join(names[index] for index in range(len(names)) if index not in done)}")
+            order.extend(ready)
+            done.update(ready)
+        return order
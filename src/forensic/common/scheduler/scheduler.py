@@ -0,0 +1,86 @@
+import asyncio
+from contextlib import asynccontextmanager
+from ipaddress import IPv4Address
+from typing import Dict
+import forensic.common.constants.constants as constants
+
+
+class ConnectionScheduler(object):
+    """Bounds the connections of a plugin run: in flight overall, in flight per device and opened per subnet."""
+
+    def __init__(self, max_connections: int = constants.MAX_CONNECTIONS,
+                 max_device_connections: int = constants.MAX_DEVICE_CONNECTIONS,
+                 subnet_prefix: int = constants.SUBNET_PREFIX, subnet_rate: float = constants.SUBNET_RATE) -> None:
+        self.max_connections = max_connections
+        self.max_device_connections = max_device_connections
+        self.subnet_mask = (0xFFFFFFFF << (32 - subnet_prefix)) & 0xFFFFFFFF
+        self.subnet_rate = subnet_rate
+        self._loop = None
+
+    @staticmethod
+    def from_parameters(parameters: Dict):
+        return ConnectionScheduler(int(parameters.get("max_connections", constants.MAX_CONNECTIONS)),
+                                   int(parameters.get("max_device_connections", constants.MAX_DEVICE_CONNECTIONS)),
+                                   int(parameters.get("subnet_prefix", constants.SUBNET_PREFIX)),
+                                   float(parameters.get("subnet_rate", constants.SUBNET_RATE)))
+
+    def _bind_loop(self):
+        # asyncio primitives belong to the loop they were first used in
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._loop = loop
+            self._connections = asyncio.Semaphore(self.max_connections)
+            self._devices = {}
+            self._subnets = {}
+
+    def subnet(self, ip: str) -> int:
+        return int(IPv4Address(ip)) & self.subnet_mask
+
+    async def _wait_subnet_rate(self, ip: str):
+        if self.subnet_rate <= 0:
+            return
+        subnet = self.subnet(ip)
+        now = self._loop.time()
+        start = max(now, self._subnets.get(subnet, now))
+        self._subnets[subnet] = start + 1 / self.subnet_rate
+        if start > now:
+            await asyncio.sleep(start - now)
+
+    @asynccontextmanager
+    async def connection(self, ip: str):
+        self._bind_loop()
+        device = self._devices.get(ip)
+        if device is None:
+            device = self._devices[ip] = [asyncio.Semaphore(self.max_device_connections), 0]
+        device[1] += 1
+        try:
+            async with device[0]:
+                await self._wait_subnet_rate(ip)
+                async with self._connections:
+                    yield
+        finally:
+            device[1] -= 1
+            if device[1] == 0:
+                del self._devices[ip]
+
+    @asynccontextmanager
+    async def spare_connection(self, ip: str):
+        """An additional connection to a device already connected, yields False rather than waiting for a free one.
+
+        Waiting could deadlock, the connections holding the limits may be waiting on their spare connections.
+        """
+        self._bind_loop()
+        device = self._devices.get(ip)
+        if device is None or device[0].locked() or self._connections.locked():
+            yield False
+            return
+
+        device[1] += 1
+        try:
+            async with device[0]:
+                async with self._connections:
+                    yield True
+        finally:
+            device[1] -= 1
+            if device[1] == 0:
+                del self._devices[ip]
@@ -1,9 +1,14 @@
+from __future__ import annotations
 import base64
 import binascii
 import struct
+import functools
 import io
+import mmap
+import os
+import weakref
 from enum import Enum
-from typing import Any, Type, List, Tuple
+from typing import Any, Type, List, Tuple, Iterator
 import sys
 import hexdump
 import string
@@ -11,6 +16,11 @@ import string
 PRINTABLE_CHARS = set(bytes(string.printable, 'ascii'))
 DEBUG_PRINT = False
 
+# Compiled struct layouts, keyed by (DataStruct subclass, stream endianness)
+_STRUCT_CODECS = {}
+# Compiled single value formats, keyed by format string
+_compiled_struct = functools.lru_cache(maxsize=1024)(struct.Struct)
+
 
 def decode_ascii(data):
     return ''.join([chr(char) if char in PRINTABLE_CHARS else '?' for char in data])
@@ -102,16 +112,74 @@ def ascii_string(x): return BasicType(DataType.ASCII_STRING, x, Sign.NONE, Endia
 def nt_ascii_string(x): return BasicType(DataType.NULL_TERMNINATED_ASCII_STRING, x, Sign.NONE, Endianness.DEFAULT)
 
 
-class DataStruct:
+class DataStructMeta(type):
+    """Stores the fields declared by a DataStruct in __slots__ instead of per-instance dicts.
+
+    Field declarations are moved to _members, compact structs also drop the instance __dict__ so only the
+    declared fields can be set on them.
+    """
+
+    def __new__(mcs, name, bases, namespace, compact=False):
+        members = [(key, val) for key, val in namespace.items()
+                   if not key.startswith('__') and isinstance(val, BasicType)]
+
+        for key, _ in members:
+            del namespace[key]
+
+        slots = [key for key, _ in members]
+        if not compact and not any(base.__dictoffset__ for base in bases):
+            slots.append('__dict__')
+
+        namespace['__slots__'] = tuple(slots)
+        namespace['_members'] = members
+        namespace['_declarations'] = {}
+        for base in reversed(bases):
+            namespace['_declarations'].update(getattr(base, '_declarations', {}))
+        namespace['_declarations'].update(members)
+
+        return super().__new__(mcs, name, bases, namespace)
+
+
+class DataStruct(metaclass=DataStructMeta, compact=True):
     def __init__(self, br=None) -> None:
         if br:
             for key, val in br.read_struct(self.__class__).items():
                 self.__setattr__(key, val)
 
+    @classmethod
+    def from_values(cls, values: dict) -> DataStruct:
+        obj = cls.__new__(cls)
+
+        for key, val in values.items():
+            obj.__setattr__(key, val)
+
+        return obj
+
     @classmethod
     def get_members(cls: object) -> List[Tuple[str, BasicType]]:
-        return list(filter(lambda x: not x[0].startswith('__') and not x[0].startswith('__'),
-                           cls.__dict__.items()))
+        return list(cls._members)
+
+    def __getattr__(self, item):
+        # Unset fields resolve to their declaration, as they did when fields were plain class attributes
+        if item in type(self)._declarations:
+            return type(self)._declarations[item]
+
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{item}'")
+
+    def to_dict(self) -> dict:
+        res = {}
+
+        for cls in reversed(type(self).__mro__):
+            for field, _ in cls.__dict__.get('_members', []):
+                try:
+                    res[field] = cls.__dict__[field].__get__(self)
+                except AttributeError:
+                    # Never set
+                    pass
+
+        res.update(getattr(self, '__dict__', {}))
+
+        return res
 
     @classmethod
     def get_size(cls: object):
@@ -123,8 +191,34 @@ class DataStruct:
         return size
 
 
+class StructSegment(object):
+    """A run of contiguous fixed-size fields decoded by a single compiled struct."""
+
+    def __init__(self, fmt: str, fields: List[str], post_processors: List[Any]) -> None:
+        self.struct = struct.Struct(fmt)
+        self.size = self.struct.size
+        self.fields = fields
+        self.post_processors = post_processors
+        self.is_raw = not any(post_processors)
+
+
+def _decode_ascii_string(obj: bytes) -> str:
+    return obj.decode('ascii', 'replace')
+
+
+def _decode_nt_ascii_string(obj: bytes) -> str:
+    obj = obj.decode('ascii', 'replace')
+    return obj[:obj.find('\x00')]
+
+
+def _reverse_bytes(obj: bytes) -> bytes:
+    return obj[::-1]
+
+
 def data_struct_serializer(obj):
-    if hasattr(obj, '__dict__'):
+    if isinstance(obj, DataStruct):
+        return obj.to_dict()
+    elif hasattr(obj, '__dict__'):
         return obj.__dict__
     elif isinstance(obj, bytes):
         return base64.b64encode(obj).decode('ascii')
@@ -136,12 +230,115 @@ class StreamNotEnoughData(Exception):
     pass
 
 
+class BufferStream(object):
+    """Read only file-like window over a bytes-like buffer (bytes, bytearray, memoryview, mmap).
+
+    Sub streams and views share the underlying buffer, nothing is copied until bytes are requested.
+    """
+
+    def __init__(self, data=b'', start: int = 0, end: int = None) -> None:
+        self._view = data if isinstance(data, memoryview) else memoryview(data)
+
+        if self._view.format != 'B' or self._view.ndim != 1:
+            self._view = self._view.cast('B')
+
+        self._start = start
+        self._end = len(self._view) if end is None else end
+        self._pos = start
+
+    def seek(self, pos: int, whence: int = 0) -> int:
+        if whence == 1:
+            pos += self._pos
+        elif whence == 2:
+            pos += self._end
+        else:
+            pos += self._start
+
+        if pos < self._start:
+            raise ValueError(f'negative seek value {pos - self._start}')
+
+        self._pos = pos
+
+        return self.tell()
+
+    def tell(self) -> int:
+        return self._pos - self._start
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def _claim(self, length: int) -> int:
+        pos = self._pos
+        end = min(self._end, pos + length) if length >= 0 else self._end
+        self._pos = max(pos, end)
+
+        return pos
+
+    def read(self, length: int = -1) -> bytes:
+        return self.read_view(length).tobytes()
+
+    def read_view(self, length: int = -1) -> memoryview:
+        pos = self._claim(length)
+
+        return self._view[pos:self._pos]
+
+    def unpack(self, st: struct.Struct) -> tuple:
+        if self._pos + st.size > self._end:
+            raise struct.error(f'unpack requires a buffer of {st.size} bytes')
+
+        res = st.unpack_from(self._view, self._pos)
+        self._pos += st.size
+
+        return res
+
+    def substream(self, length: int) -> BufferStream:
+        pos = self._claim(length)
+
+        return BufferStream(self._view, pos, self._pos)
+
+
+class MappedFile(object):
+    """Read only memory mapping of a file, to be used as a BinaryReader source without reading it up-front."""
+
+    def __init__(self, file_path) -> None:
+        self._mmap = None
+
+        with open(file_path, 'rb') as f:
+            # Empty files can't be mapped
+            if os.fstat(f.fileno()).st_size > 0:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    @property
+    def data(self):
+        return b'' if self._mmap is None else self._mmap
+
+    def close(self) -> None:
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                # Views of the mapping are still alive, it is unmapped once they are collected
+                pass
+
+            self._mmap = None
+
+    def __enter__(self):
+        return self.data
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
 class BinaryStream(object):
-    DEBUG_DATA = {}
+    # Traces of the streams with debug enabled, weakly referenced so tracing doesn't keep streams alive
+    DEBUG_DATA = weakref.WeakKeyDictionary()
+
+    def __init__(self, base_stream: bytes = b'', endianness: Endianness = Endianness.LITTLE,
+                 debug: bool = None) -> None:
+        self._debug_data = None
 
-    def __init__(self, base_stream: bytes = b'', endianness: Endianness = Endianness.LITTLE) -> None:
-        if self not in BinaryStream.DEBUG_DATA:
-            BinaryStream.DEBUG_DATA[self] = []
+        if DEBUG_PRINT if debug is None else debug:
+            self.enable_debug()
 
         self._int_size_map = {BITS_8: 'b',
                               BITS_16: 'h',
@@ -152,7 +349,18 @@ class BinaryStream(object):
                                 BITS_64: 'd'}
 
         self._endianness = endianness
-        self._base_stream = io.BytesIO(base_stream)
+        self._base_stream = self._open_stream(base_stream)
+
+    def _open_stream(self, base_stream: bytes):
+        return io.BytesIO(base_stream)
+
+    def enable_debug(self) -> None:
+        if self._debug_data is None:
+            self._debug_data = BinaryStream.DEBUG_DATA.setdefault(self, [])
+
+    def disable_debug(self) -> None:
+        BinaryStream.DEBUG_DATA.pop(self, None)
+        self._debug_data = None
 
     def _is_le(self, endianness: Endianness) -> bool:
         true_endianness = self._endianness if endianness == Endianness.DEFAULT else endianness
@@ -179,6 +387,55 @@ class BinaryStream(object):
 
         return code
 
+    def _post_processor(self, basic_type: BasicType):
+        if basic_type.data_type == DataType.ASCII_STRING:
+            return _decode_ascii_string
+        elif basic_type.data_type == DataType.NULL_TERMNINATED_ASCII_STRING:
+            return _decode_nt_ascii_string
+        elif basic_type.data_type == DataType.BYTES:
+            if self._is_le(basic_type.endianness) and basic_type.size > 1:
+                return _reverse_bytes
+
+        return None
+
+    def _compile_struct(self, struct_class: Type[DataStruct]) -> List[StructSegment]:
+        key = (struct_class, self._endianness)
+        segments = _STRUCT_CODECS.get(key)
+
+        if segments is None:
+            segments = []
+            byte_order = None
+            fmt, fields, post_processors = '', [], []
+
+            for field, dt in struct_class.get_members():
+                if dt == dynamic:
+                    continue
+
+                code = self._build_struct_format(dt.data_type, dt.size, dt.sign, dt.endianness)
+
+                # A struct format has a single byte order, numbers of a different one start a new segment
+                # while byte strings don't depend on it
+                if code[0] in '<>' and code[-1] == 's':
+                    code = code[1:]
+                elif code[0] in '<>':
+                    if byte_order is not None and code[0] != byte_order:
+                        segments.append(StructSegment(byte_order + fmt, fields, post_processors))
+                        fmt, fields, post_processors = '', [], []
+
+                    byte_order = code[0]
+                    code = code[1:]
+
+                fmt += code
+                fields.append(field)
+                post_processors.append(self._post_processor(dt))
+
+            if fields:
+                segments.append(StructSegment((byte_order or '<') + fmt, fields, post_processors))
+
+            _STRUCT_CODECS[key] = segments
+
+        return segments
+
     def _seek(self, pos: int, whence: int = 0) -> None:
         self._base_stream.seek(pos, whence)
 
@@ -231,15 +488,21 @@ class BinaryStream(object):
         self._seek(pos - basic_type.size)
         raw = self._base_stream.read(basic_type.size)
 
-        BinaryStream.DEBUG_DATA[self].append((dt_name, obj_repr, raw, basic_type.size))
+        self._debug_data.append((dt_name, obj_repr, raw, basic_type.size))
 
 
 class BinaryReader(BinaryStream):
+    def _open_stream(self, base_stream: bytes):
+        if isinstance(base_stream, BufferStream):
+            return base_stream
+
+        return BufferStream(base_stream)
+
     def _unpack(self, fmt: str, length: int) -> Any:
-        return struct.unpack(fmt, self._base_stream.read(length))[0]
+        return self._base_stream.unpack(_compiled_struct(fmt))[0]
 
     def _unpack_tp(self, fmt: str, length: int):
-        return struct.unpack(fmt, self._base_stream.read(length))
+        return self._base_stream.unpack(_compiled_struct(fmt))
 
     def peek_bytes(self, length: int) -> bytes:
         pos = self._tell()
@@ -270,20 +533,73 @@ class BinaryReader(BinaryStream):
             if self._is_le(basic_type.endianness) and basic_type.size > 1:
                 obj = obj[::-1]
 
-        if DEBUG_PRINT:
+        if self._debug_data is not None:
             self._debug_print(basic_type, obj, dt_name)
 
         return obj
 
-    def read_struct(self, struct_class: Type[DataStruct]) -> dict:
+    def read_struct(self, struct_class: Type[DataStruct], enable_check=True) -> dict:
         res = {}
 
-        for field, dt in struct_class.get_members():
-            if dt != dynamic:
-                res[field] = self.read(dt, f'{struct_class.__name__}.{field}')
+        if self._debug_data is not None:
+            for field, dt in struct_class.get_members():
+                if dt != dynamic:
+                    res[field] = self.read(dt, f'{struct_class.__name__}.{field}')
+
+            return res
+
+        for segment in self._compile_struct(struct_class):
+            if enable_check and segment.size > self.remaining_data():
+                raise StreamNotEnoughData()
+
+            values = self._base_stream.unpack(segment.struct)
+
+            if segment.is_raw:
+                res.update(zip(segment.fields, values))
+            else:
+                for field, value, post_processor in zip(segment.fields, values, segment.post_processors):
+                    res[field] = post_processor(value) if post_processor else value
 
         return res
 
+    def iter_structs(self, struct_class: Type[DataStruct], count: int, enable_check=True) -> Iterator[tuple]:
+        """Decodes count consecutive records at once, yielding a tuple of the field values of each record."""
+        segments = self._compile_struct(struct_class)
+        size = sum(segment.size for segment in segments)
+
+        if enable_check and count * size > self.remaining_data():
+            raise StreamNotEnoughData()
+
+        # Records with mixed byte orders (or traced reads) can't be decoded by a single struct
+        if self._debug_data is not None or len(segments) != 1:
+            return iter([tuple(self.read_struct(struct_class, enable_check).values()) for _ in range(count)])
+
+        segment = segments[0]
+        records = segment.struct.iter_unpack(self._base_stream.read(count * size))
+
+        if segment.is_raw:
+            return records
+
+        return (tuple(post_processor(value) if post_processor else value
+                      for value, post_processor in zip(values, segment.post_processors)) for values in records)
+
+    def read_structs(self, struct_class: Type[DataStruct], count: int, enable_check=True) -> List[dict]:
+        fields = [field for segment in self._compile_struct(struct_class) for field in segment.fields]
+
+        return [dict(zip(fields, values)) for values in self.iter_structs(struct_class, count, enable_check)]
+
+    def read_view(self, length: int) -> memoryview:
+        if length > self.remaining_data():
+            raise StreamNotEnoughData()
+
+        return self._base_stream.read_view(length)
+
+    def sub_reader(self, length: int) -> BinaryReader:
+        if length > self.remaining_data():
+            raise StreamNotEnoughData()
+
+        return BinaryReader(self._base_stream.substream(length), self._endianness)
+
     def remaining_data(self) -> int:
         return len(self) - self._tell()
 
@@ -295,8 +611,8 @@ class BinaryReader(BinaryStream):
 
 
 class BinaryWriter(BinaryStream):
-    def __init__(self, endianness: Endianness = Endianness.LITTLE) -> None:
-        super().__init__(b'', endianness)
+    def __init__(self, endianness: Endianness = Endianness.LITTLE, debug: bool = None) -> None:
+        super().__init__(b'', endianness, debug)
 
     def _pack(self, fmt: str, data: Any) -> None:
         self._base_stream.write(struct.pack(fmt, data))
@@ -315,7 +631,7 @@ class BinaryWriter(BinaryStream):
         self._pack(self._build_struct_format(basic_type.data_type, basic_type.size,
                                              basic_type.sign, basic_type.endianness), value)
 
-        if DEBUG_PRINT:
+        if self._debug_data is not None:
             self._debug_print(basic_type, value, dt_name)
 
     def write_struct(self, struct_class: Type[DataStruct], struct_data: dict) -> None:
@@ -324,26 +640,25 @@ class BinaryWriter(BinaryStream):
                 self.write(dt, struct_data[field], f'{struct_class.__name__}.{field}')
 
     def __add__(self, other):
-        bw = BinaryWriter()
+        bw = BinaryWriter(debug=False)
         bw.write(bytesbe(len(self)), self.dump())
         bw.write(bytesbe(len(other)), other.dump())
 
-        if DEBUG_PRINT:
-            if other not in BinaryStream.DEBUG_DATA:
-                BinaryStream.DEBUG_DATA[other] = []
-
-            BinaryStream.DEBUG_DATA[bw] = BinaryStream.DEBUG_DATA[self] + BinaryStream.DEBUG_DATA[other]
-            del BinaryStream.DEBUG_DATA[self]
-            del BinaryStream.DEBUG_DATA[other]
+        # The merged writer takes over the traces of both operands
+        if self._debug_data is not None or other._debug_data is not None:
+            bw.enable_debug()
+            bw._debug_data += (self._debug_data or []) + (other._debug_data or [])
+            self.disable_debug()
+            other.disable_debug()
 
         return bw
 
     def __iadd__(self, other):
         self.write(bytesbe(len(other)), other.dump())
 
-        if DEBUG_PRINT:
-            BinaryStream.DEBUG_DATA[self] += BinaryStream.DEBUG_DATA[other]
-            del BinaryStream.DEBUG_DATA[other]
+        if self._debug_data is not None and other._debug_data is not None:
+            self._debug_data += other._debug_data
+            other.disable_debug()
 
         return self
 
@@ -351,7 +666,7 @@ class BinaryWriter(BinaryStream):
 def debug_print():
     print_res = ''
 
-    for key, val in BinaryStream.DEBUG_DATA.items():
+    for key, val in list(BinaryStream.DEBUG_DATA.items()):
         all_data = b''
         if len(val) == 0:
             continue
@@ -0,0 +1,62 @@
+import json
+import threading
+from pathlib import Path
+from typing import Optional, Set, Tuple
+from forensic.common.artifacts.artifacts import RecordJournal
+
+
+class SweepJournal(object):
+    """Work completed by a plugin run, keyed by address and the plugin's finer units such as rack/slot and block.
+
+    A resumed run skips what the interrupted run completed, a new run starts the journal over.
+    """
+
+    def __init__(self, journal_file: Path, resume: bool = False) -> None:
+        self.journal_file = Path(journal_file)
+        self.resume = resume
+        self._completed: Set[Tuple] = set()
+        self._journal: Optional[RecordJournal] = None
+        # Completed from the executor threads, so the fsync of each record stays off the event loop
+        self._lock = threading.Lock()
+        if resume and self.journal_file.is_file():
+            with open(self.journal_file, 'r') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # The last record of an interrupted run may be cut short
+                        break
+                    self._completed.add(tuple(record['key']))
+
+    def __len__(self):
+        return len(self._completed)
+
+    def done(self, *key) -> bool:
+        return key in self._completed
+
+    def complete(self, *key):
+        with self._lock:
+            # Opened on first use, replacing the journal of a previous run unless it is resumed
+            if self._journal is None:
+                self.journal_file.parent.mkdir(parents=True, exist_ok=True)
+                if not self.resume:
+                    self.journal_file.unlink(missing_ok=True)
+                self._journal = RecordJournal(self.journal_file)
+            self._journal.write({'key': list(key)})
+            self._completed.add(key)
+
+    def close(self):
+        if self._journal is not None:
+            self._journal.close()
+            self._journal = None
+
+    def finish(self):
+        """The whole sweep is done, there is nothing left to resume"""
+        self.close()
+        self.journal_file.unlink(missing_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
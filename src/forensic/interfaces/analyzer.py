@@ -1,14 +1,23 @@
 from __future__ import annotations
 from abc import ABC, abstractmethod
 from pathlib import Path
-from typing import Dict
+from typing import Dict, List
 from collections import defaultdict
+from forensic.common.cache.cache import AnalysisCache
 from forensic.common.logger.logger import LoggerHandler
 import forensic.common.constants.constants as constants
 import os
 
 
 class AnalyzerInterface(ABC):
+    # Analyzers which can process a single device's output as soon as it is acquired implement analyze_device
+    device_analysis = False
+    # Output directories of the plugin read and written by the analyzer, the application orders the analyzers by them
+    inputs: List[str] = []
+    outputs: List[str] = []
+    # Bumped whenever the analyzer output changes, invalidating its cached results
+    version = 1
+
     def __init__(self, config: AnalyzerConfig, output_dir: Path, verbose: bool):
         self.config = config
         self.output_dir = output_dir
@@ -23,14 +32,27 @@ class AnalyzerInterface(ABC):
         except Exception as e:
             self.logger.exception(e)
 
+    def run_device(self, ip: str):
+        try:
+            self.analyze_device(ip)
+        except Exception as e:
+            self.logger.exception(e)
+
     def create_output_dir(self, plugin_name):
         self.output_dir = self.output_dir.joinpath(plugin_name, self.config.name)
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
+    def open_cache(self) -> AnalysisCache:
+        return AnalysisCache(self.output_dir.parent.joinpath(constants.CACHE_DIR, f'{self.config.name}.sqlite'),
+                             self.version)
+
     @abstractmethod
     def analyze(self):
         pass
 
+    def analyze_device(self, ip: str):
+        raise NotImplementedError(f'{self.config.name} analyzes all the devices at once')
+
 
 class AnalyzerCLI(ABC):
 
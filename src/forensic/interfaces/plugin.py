@@ -1,9 +1,12 @@
 from __future__ import annotations
+import asyncio
 from abc import ABC, abstractmethod
 from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import Any, Callable, Dict, List
 from forensic.common.logger.logger import LoggerHandler
+from forensic.common.scheduler.scheduler import ConnectionScheduler
+from forensic.common.sweep.sweep import SweepJournal
 from forensic.interfaces.analyzer import AnalyzerConfig, AnalyzerInterface
 from forensic.scanner.discover import Discover
 from forensic.common.constants.constants import Transport
@@ -14,6 +17,9 @@ import os
 
 
 class PluginInterface(ABC):
+    # Analyzers run on the plugin output by the pipeline mode when none are configured
+    default_analyzers: List[str] = []
+
     def __init__(self, config: PluginConfig, output_dir: Path, verbose: bool):
         self.config = config
         self.output_dir = output_dir.joinpath(self.config.name)
@@ -22,30 +28,75 @@ class PluginInterface(ABC):
         self.logger = self.logger_handler.get_logger()
         if verbose:
             self.logger_handler.create_log_file(os.path.join(os.getcwd(), constants.LOGS_DIR, f'{self.config.name}Plugin.log'))
+        self.scheduler = ConnectionScheduler.from_parameters(self.config.parameters)
+        self.sweep = SweepJournal(self.output_dir.joinpath(constants.SWEEP_JOURNAL),
+                                  bool(self.config.parameters.get("resume", False)))
+        self._executor = None
 
-    def run(self):
+    def run(self, on_device: Callable[[Dict], None] = None):
+        """Each device is exported, and handed to on_device when given, as soon as it is acquired"""
         if not self.config.addresses:
             raise Exception("IP addresses were not provided")
+        try:
+            extracted = asyncio.run(self._run(on_device))
+        finally:
+            self.sweep.close()
+        self.logger.info(f'Found {len(extracted)} devices in port {self.config.port}')
+        # The devices are exported one by one as they are acquired, the export event still carries all of them
+        if extracted and self.config.cb_event is not None:
+            self.config.cb_event("export", extracted)
+        self.sweep.finish()
+
+    async def _run(self, on_device: Callable[[Dict], None] = None) -> List:
         extracted = []
-        discover = Discover()
-        sockets = discover.get_socket_addresses(self.config.addresses)
-        addresses = [socket["ip"] for socket in sockets]
+        discover = Discover(int(self.config.parameters.get("scan_retries", constants.SCAN_RETRIES)))
+        exclude = self.config.parameters.get("exclude", [])
+        if isinstance(exclude, str):
+            exclude = exclude.split(",")
+        sockets = self._pending(discover.get_socket_addresses(self.config.addresses, exclude))
+        addresses = [str(address["ip"]) for address in self.config.addresses]
         if self.config.transport == Transport.TCP.value:
             self.logger.info(f"Discovering addresses: {', '.join(addresses)}...")
-            sockets = discover.scan(sockets, self.config.port)
-            self.logger.info(f"Discovered addresses: {', '.join(addresses)}")
-        with ThreadPoolExecutor(max_workers=30) as executor:
-            for socket in sockets:
-                executor.submit(self._exec, socket, extracted)
-        self.logger.info(f'Found {len(extracted)} devices in port {self.config.port}')
-        if extracted:
-            self.export(extracted)
+            sockets = discover.scan_stream(sockets, self.config.port, self.scheduler)
+        else:
+            sockets = self._iter_async(sockets)
+        # Devices are acquired while the discovery is still running
+        tasks = set()
+        with ThreadPoolExecutor(max_workers=constants.THREAD_WORKERS) as self._executor:
+            async for socket in sockets:
+                if self.config.transport == Transport.TCP.value:
+                    self.logger.info(f"Discovered address: {socket['ip']}")
+                if len(tasks) >= constants.ASYNC_WORKERS:
+                    _, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                tasks.add(asyncio.ensure_future(self._exec(socket, extracted, on_device)))
+            if tasks:
+                await asyncio.wait(tasks)
+        return extracted
 
-    def _exec(self, address: str, extracted: List):
+    @staticmethod
+    async def _iter_async(items):
+        for item in items:
+            yield item
+
+    def _pending(self, sockets):
+        for socket in sockets:
+            if self.sweep.done(socket["ip"]):
+                self.logger.info(f"Skipping address completed by the resumed sweep: {socket['ip']}")
+            else:
+                yield socket
+
+    async def _exec(self, address: dict, extracted: List, on_device: Callable[[Dict], None] = None):
         try:
-            result = self.connect(address)
+            result = await self.connect_async(address)
             if result:
                 extracted.append(result)
+                loop = asyncio.get_running_loop()
+                # Exported right away so an interrupted sweep keeps the devices it completed
+                await loop.run_in_executor(self._executor, self.export, [result])
+                if on_device is not None:
+                    on_device(result)
+                # A device that failed or answered nothing is left for the resumed sweep to fetch again
+                await loop.run_in_executor(self._executor, self.sweep.complete, address["ip"])
         except Exception as e:
             self.logger.exception(e)
 
@@ -53,10 +104,15 @@ class PluginInterface(ABC):
     def connect(self, address: str):
         pass
 
+    async def connect_async(self, address: dict):
+        # Plugins with blocking clients are run on a bounded thread pool
+        async with self.scheduler.connection(address["ip"]):
+            return await asyncio.get_running_loop().run_in_executor(self._executor, self.connect, address)
+
     @abstractmethod
     def export(self, extracted):
-        if self.config.cb_event is not None:
-            self.config.cb_event("export", extracted)
+        """Writes the acquired devices, called on an executor thread with each device as soon as it is acquired"""
+        pass
 
 
 class PluginCLI(ABC):
@@ -86,6 +142,36 @@ class PluginCLI(ABC):
                             choices=[Transport.TCP.value, Transport.UDP.value],
                             default=transport.value,
                             type=str)
+        parser.add_argument("--max_connections",
+                            help=f"Max connections in flight, default is {constants.MAX_CONNECTIONS}",
+                            metavar="",
+                            type=int)
+        parser.add_argument("--max_device_connections",
+                            help=f"Max connections in flight to a single device, "
+                                 f"default is {constants.MAX_DEVICE_CONNECTIONS}",
+                            metavar="",
+                            type=int)
+        parser.add_argument("--subnet_prefix",
+                            help=f"Prefix length of the subnets rate limited by --subnet_rate, "
+                                 f"default is {constants.SUBNET_PREFIX}",
+                            metavar="",
+                            type=int)
+        parser.add_argument("--subnet_rate",
+                            help="Max new connections per second to each subnet, default is unlimited",
+                            metavar="",
+                            type=float)
+        parser.add_argument("--scan_retries",
+                            help=f"Connect retries before an address is considered down, "
+                                 f"default is {constants.SCAN_RETRIES}",
+                            metavar="",
+                            type=int)
+        parser.add_argument("--exclude",
+                            help="IP addresses or CIDRs csv to skip",
+                            metavar="",
+                            type=str)
+        parser.add_argument("--resume",
+                            help="Skip the addresses completed by an interrupted run with the same output directory",
+                            action="store_true")
         parser.add_argument("--analyzer",
                             help="Analyzer name to run",
                             choices=self.get_analyzer_choices(),
@@ -21,6 +21,8 @@ class CodeSysV3CLI(PluginCLI):
 
 
 class CodeSysV3(PluginInterface):
+    default_analyzers = ["CS3RawFileParser", "CS3BlockLogic"]
+
     def __init__(self, config: PluginConfig, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.port = config.parameters.get("port")
@@ -21,6 +21,8 @@ class LogixCLI(PluginCLI):
 
 
 class Logix(PluginInterface):
+    default_analyzers = ["RockwellRslogixRawFileParser", "RockwellRslogixBlockLogic"]
+
     def __init__(self, config: PluginConfig, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
 
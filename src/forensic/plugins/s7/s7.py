@@ -1,14 +1,23 @@
-import json
+import asyncio
 import socket
-from tenacity import retry, retry_if_exception_type, stop_after_attempt
+from functools import partial
 from pathlib import Path
-from forensic.plugins.s7.s7_client import S7Conn, InvalidS7RackSlot
-from forensic.plugins.s7.s7_parser import S7Error
+from typing import Awaitable, Callable
+from forensic.plugins.s7.s7_client import S7AsyncConn, S7SessionPool, InvalidS7RackSlot, S7SessionReset
+from forensic.plugins.s7.s7_parser import S7Error, MAX_AMQ, MAX_PDU_LENGTH
 from forensic.common.constants.constants import Transport
 from forensic.interfaces.plugin import PluginInterface, PluginConfig, PluginCLI
+from forensic.common.artifacts.artifacts import ArtifactStore
 from forensic.common.stream.stream import data_struct_serializer
-from concurrent.futures import ThreadPoolExecutor
-from collections import defaultdict
+from collections import defaultdict, deque
+from itertools import chain
+
+SMART_DISCOVERY = 'smart'
+FULL_DISCOVERY = 'full'
+# Attempts at each request of an acquisition, a failed request is retried alone on a healthy session
+REQUEST_ATTEMPTS = 3
+# Seconds before the first retry, doubled for each next one so the CPU can release the connection it dropped
+RETRY_DELAY = 0.2
 
 
 class S7CLI(PluginCLI):
@@ -21,54 +30,319 @@ class S7CLI(PluginCLI):
 
     def flags(self, parser):
         self.base_flags(parser, self.port, self.transport)
+        parser.add_argument('--max_racks', help='Racks probed for CPUs, default 8', metavar="", type=int)
+        parser.add_argument('--max_slots', help='Slots probed in each rack, default 32', metavar="", type=int)
+        parser.add_argument('--rack_slot_discovery',
+                            help=f'{SMART_DISCOVERY}: common slots first and stop at the first CPU, '
+                                 f'{FULL_DISCOVERY}: every rack and slot, default is {SMART_DISCOVERY}',
+                            choices=[SMART_DISCOVERY, FULL_DISCOVERY], type=str)
+        parser.add_argument('--pdu_length',
+                            help=f'PDU length proposed to the CPUs, which may grant less, default {MAX_PDU_LENGTH}',
+                            metavar="", type=int)
+        parser.add_argument('--full_upload',
+                            help='Upload every block, even those unchanged since the previous sweep',
+                            action='store_true')
+        parser.add_argument('--upload_sessions',
+                            help='Connections to a CPU sharing its block uploads, within --max_device_connections, '
+                                 'default 3', metavar="", type=int)
 
 
 class S7(PluginInterface):
+    default_analyzers = ["S7RawFileParser", "S7BlockLogic"]
+    # Where S7-300/400 (rack 0 slot 2/3) and S7-1200/1500 (rack 0 slot 0/1) CPUs usually sit
+    COMMON_RACK_SLOTS = [(0, 0), (0, 1), (0, 2), (0, 3)]
+
     def __init__(self, config: PluginConfig, output_dir: Path, verbose: bool):
         super().__init__(config, output_dir, verbose)
         self.MAX_RACK = config.parameters.get("max_racks", 8)
         self.MAX_SLOT = config.parameters.get("max_slots", 32)
+        self.rack_slot_discovery = config.parameters.get("rack_slot_discovery", SMART_DISCOVERY)
+        self.upload_sessions = int(config.parameters.get("upload_sessions", 3))
+        self.pdu_length = int(config.parameters.get("pdu_length", MAX_PDU_LENGTH))
+        self.full_upload = bool(config.parameters.get("full_upload", False))
+        self.sessions = S7SessionPool(self.logger, self.config.port, pdu_length=self.pdu_length)
+        self._journals = {}
+
+    async def _request(self, address: str, rack: int, slot: int, request: Callable[[S7AsyncConn], Awaitable]):
+        """Runs the request on the pooled session of the rack/slot, retrying only this request when it fails"""
+        for attempt in range(1, REQUEST_ATTEMPTS + 1):
+            try:
+                async with self.sessions.session(address, rack, slot) as s7:
+                    return await request(s7)
+            except InvalidS7RackSlot:
+                raise
+            except Exception as e:
+                if attempt == REQUEST_ATTEMPTS:
+                    raise
+                self.logger.info(f'Retrying request after {e!r} for IP: {address}, '
+                                 f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+                await asyncio.sleep(RETRY_DELAY * 2 ** (attempt - 1))
+
+    @staticmethod
+    async def _identify(s7: S7AsyncConn):
+        try:
+            return await s7.dump_plc(upload=False), s7.pdu_length
+        except ConnectionError as e:
+            # The session is set up by now, a CPU sits at this rack/slot
+            raise S7SessionReset() from e
 
-    @retry(retry=(retry_if_exception_type(TimeoutError) | retry_if_exception_type(S7Error)), stop=stop_after_attempt(3))
-    def _conn(self, files, address, rack, slot):
+    async def _conn(self, files, address, rack, slot):
+        identified = False
         try:
             address = address["ip"]
-            with S7Conn(self.logger, address, self.config.port, rack, slot) as s7:
-                data = s7.dump_plc()
-                if data:
-                    files[address].append(data)
-                    self.logger.info(f'Successfully connected to IP: {address}, '
+            data, pdu_length = await self._request(address, rack, slot, self._identify)
+            identified = True
+            if data:
+                identity = self._identity(data)
+                if identity is not None and any(self._identity(known) == identity for known in files.get(address, [])):
+                    # CPUs and CPs may accept the connection on several TSAPs for the same module
+                    self.logger.info(f'Module {identity} already acquired for IP: {address}, '
                                      f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+                    return
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(self._executor, self._journals[address].write, data)
+                if blocks := await self._upload_blocks(address, rack, slot):
+                    data['blocks'] = blocks
+                files[address].append(data)
+                await loop.run_in_executor(self._executor, self.sweep.complete, address, rack, slot)
+                self.logger.info(f'Successfully connected to IP: {address}, '
+                                 f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}, '
+                                 f'PDU length: {pdu_length}')
         except InvalidS7RackSlot:
             self.logger.info(f'Invalid S7 rack slot for IP: {address}, '
                              f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
-        except socket.timeout:
+        except (socket.timeout, asyncio.TimeoutError):
             self.logger.info(f'Timeout error for IP: {address}, '
                              f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
             raise TimeoutError
-        except ConnectionResetError:
+        except ConnectionResetError as e:
             self.logger.info(f'Connection reset error for IP: {address}, '
                              f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+            if identified or isinstance(e, S7SessionReset):
+                # The CPU is there, the discovery has nothing left to look for on the other rack/slots
+                raise S7SessionReset() from e
         except Exception as e:
             self.logger.exception(f'{e} for IP: {address}, '
                                   f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
             raise S7Error
 
+    def _previous_blocks(self, store: ArtifactStore, address: str, rack: int, slot: int) -> dict:
+        """Block records of the rack/slot in the previous sweep's index and in the journal of an interrupted or
+        failed acquisition, for those whose bytes are stored"""
+        name = address.replace(".", "_")
+        if self.full_upload:
+            return {}
+
+        index = store.read_index(name) if store.index_path(name).is_file() else []
+        return {record['block']: record for record in chain(index, store.read_journal(name))
+                if 'block' in record and record['rack'] == rack and record['slot'] == slot
+                and 'digest' in record and store.blob_path(record['digest']).is_file()}
+
+    def _persist_block(self, store: ArtifactStore, address: str, rack: int, slot: int, name: str, block: dict):
+        # The bytes are on disk before the journal record referencing them, and no longer kept in memory
+        if 'data' in block:
+            data = block.pop('data')
+            block['digest'] = store.put_blob(data, sync=True)
+            block['size'] = len(data)
+        self._journals[address].write({'rack': rack, 'slot': slot, 'block': name, **block})
+
+    async def _upload_blocks(self, address: str, rack: int, slot: int) -> dict:
+        blocks = await self._request(address, rack, slot, lambda s7: s7.blocks())
+        uploaded = {}
+
+        # Blocks with the checksum and timestamp of the previous sweep are taken from the store instead of uploaded
+        store = ArtifactStore(self.output_dir.joinpath('S7RawFileParser'))
+        previous = self._previous_blocks(store, address, rack, slot)
+        loop = asyncio.get_running_loop()
+        pending = deque()
+        infos = []
+        # Queried a pipeline's worth at a time, a failure only repeats its batch
+        for batch in (blocks[start:start + MAX_AMQ] for start in range(0, len(blocks), MAX_AMQ)):
+            infos += await self._request(address, rack, slot, lambda s7: s7.blocks_info(batch))
+        for block, info in zip(blocks, infos):
+            name = f'{block["type"]}{block["num"]}'
+            if info is not None:
+                block['check_sum'] = info.check_sum
+                block['last_modified'] = info.code_timestamp.hex()
+            record = previous.get(name)
+            if info is not None and record is not None and record.get('check_sum') == block['check_sum'] \
+                    and record.get('last_modified') == block['last_modified']:
+                block['protected'] = record.get('protected', False)
+                block['digest'], block['size'] = record['digest'], record.get('size')
+                await loop.run_in_executor(self._executor, self._persist_block, store, address, rack, slot, name,
+                                           block)
+                uploaded[name] = block
+            else:
+                pending.append(block)
+
+        if previous:
+            self.logger.info(f'{len(uploaded)} of {len(blocks)} blocks unchanged for IP: {address}, '
+                             f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+
+        async def upload(run: Callable[[Callable[[S7AsyncConn], Awaitable]], Awaitable]):
+            while pending:
+                block = pending.popleft()
+                try:
+                    blocks_data = await run(lambda s7: s7.upload_blocks([block]))
+                except BaseException:
+                    pending.appendleft(block)
+                    raise
+                for name, block_data in blocks_data.items():
+                    await loop.run_in_executor(self._executor, self._persist_block, store, address, rack, slot,
+                                               name, block_data)
+                    uploaded[name] = block_data
+
+        # The blocks are shared out to the pooled session, whose requests are retried, and spare sessions
+        async def spare_session():
+            async with self.scheduler.spare_connection(address) as available:
+                if not available or not pending:
+                    return
+                try:
+                    async with S7AsyncConn(self.logger, address, self.config.port, rack, slot,
+                                           pdu_length=self.pdu_length) as conn:
+                        await upload(lambda request: request(conn))
+                except Exception as e:
+                    # CPUs refuse connections beyond their limit, the other sessions take over the blocks
+                    self.logger.info(f'Spare session failed with {e!r} for IP: {address}, '
+                                     f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+
+        results = await asyncio.gather(upload(partial(self._request, address, rack, slot)),
+                                       *(spare_session() for _ in range(self.upload_sessions - 1)),
+                                       return_exceptions=True)
+        # The spare sessions may have uploaded what the first session failed to
+        if pending and isinstance(results[0], BaseException):
+            raise results[0]
+        # A spare session that failed after the first one ran out of blocks put its block back, drained here
+        await upload(partial(self._request, address, rack, slot))
+
+        names = [f'{block["type"]}{block["num"]}' for block in blocks]
+        return {name: uploaded[name] for name in names if name in uploaded}
+
+    def _restore(self, address: str, rack: int, slot: int):
+        """The rack/slot as acquired by an interrupted sweep, read back from the device journal"""
+        store = ArtifactStore(self.output_dir.joinpath('S7RawFileParser'))
+        records = self._attempts(store.read_journal(address.replace(".", "_"))).get((rack, slot))
+        if not records:
+            return None
+
+        data = dict(records[0])
+        if blocks := {record['block']: {key: value for key, value in record.items()
+                                        if key not in ('rack', 'slot', 'block')} for record in records[1:]}:
+            data['blocks'] = blocks
+        return data
+
+    async def _probe(self, files, address, rack, slot):
+        if self.sweep.done(address["ip"], rack, slot) and \
+                (data := self._restore(address["ip"], rack, slot)) is not None:
+            self.logger.info(f'Restored from the resumed sweep IP: {address["ip"]}, '
+                             f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+            files[address["ip"]].append(data)
+            return
+        async with self.scheduler.connection(address["ip"]):
+            try:
+                await self._conn(files, address, rack, slot)
+            finally:
+                await self.sessions.close(address["ip"], rack, slot)
+
     def connect(self, address: str):
+        return asyncio.run(self.connect_async(address))
+
+    @staticmethod
+    def _identity(data: dict):
+        # The module serial number from SZL 0x001C, or its order number from SZL 0x0011
+        for szl, field in (('szl_001C', 'serial_number'), ('szl_0011', 'module')):
+            for entry in data.get('szl', {}).get(szl, []):
+                # Entries restored from a journal are already plain dicts
+                if value := (entry if isinstance(entry, dict) else entry.to_dict()).get(field):
+                    return value
+        return None
+
+    async def _probe_all(self, files, address, rack_slots):
+        return await asyncio.gather(*(self._probe(files, address, rack, slot) for rack, slot in rack_slots),
+                                    return_exceptions=True)
+
+    async def connect_async(self, address: str):
         files = defaultdict(list)
-        with ThreadPoolExecutor(max_workers=30) as executor:
-            for rack in range(0, self.MAX_RACK):
-                for slot in range(0, self.MAX_SLOT):
-                    executor.submit(self._conn, files, address, rack, slot)
+        store = ArtifactStore(self.output_dir.joinpath('S7RawFileParser'))
+        name = address["ip"].replace(".", "_")
+        # Rack/slots and blocks are journaled as they are acquired, the device index is written once it is done
+        self._journals[address["ip"]] = store.open_journal(name, default=data_struct_serializer)
+        try:
+            await self._discover(files, address)
+        finally:
+            self._journals.pop(address["ip"]).close()
+
+        if files:
+            store.write_index(name, self._index_records(store.read_journal(name), files[address["ip"]]))
+            store.remove_journal(name)
+        elif not store.journal_path(name).stat().st_size:
+            store.remove_journal(name)
         return files
 
+    async def _discover(self, files, address: dict):
+        rack_slots = [(rack, slot) for rack in range(0, self.MAX_RACK) for slot in range(0, self.MAX_SLOT)]
+        if self.rack_slot_discovery == FULL_DISCOVERY:
+            await self._probe_all(files, address, rack_slots)
+            return
+
+        # The common slots one at a time, then the remaining slots rack by rack, until a CPU answers. SZL 0x0011 and
+        # 0x001C only answer on a connected rack/slot, they tell apart the modules found rather than place them
+        common = [rack_slot for rack_slot in self.COMMON_RACK_SLOTS if rack_slot in rack_slots]
+        for rack, slot in common:
+            error = (await self._probe_all(files, address, [(rack, slot)]))[0]
+            if files:
+                return
+            if error is not None:
+                # Not an S7 device or not answering, the other slots would fail the same way. Or a CPU that reset
+                # the session it accepted, the sweep leaves it to be retried on resume
+                self.logger.info(f'Rack/slot discovery stopped for IP: {address["ip"]}, '
+                                 f'Port: {self.config.port}, Rack: {rack}, Slot: {slot}')
+                return
+
+        for rack in range(0, self.MAX_RACK):
+            errors = await self._probe_all(files, address, [(rack, slot) for slot in range(0, self.MAX_SLOT)
+                                                            if (rack, slot) not in common])
+            if files or any(isinstance(error, S7SessionReset) for error in errors):
+                break
+
+    @staticmethod
+    def _attempts(journal) -> dict:
+        # Each attempt at a rack/slot is journaled as its rack/slot record followed by a record per block
+        attempts = {}
+        for record in journal:
+            rack_slot = (record['rack'], record['slot'])
+            if 'block' not in record:
+                attempts[rack_slot] = [record]
+            elif rack_slot in attempts:
+                attempts[rack_slot].append(record)
+        return attempts
+
+    def _index_records(self, journal, acquired):
+        # The index keeps the last attempt of the rack/slots acquired, whose block bytes are kept as blobs
+        attempts = self._attempts(journal)
+        for slot_rack in acquired:
+            yield from attempts.get((slot_rack['rack'], slot_rack['slot']), [])
+
+    @staticmethod
+    def _export_records(store: ArtifactStore, data):
+        # A record per rack/slot followed by a record per block, the block bytes are kept as blobs
+        for slot_rack in data:
+            yield {key: value for key, value in slot_rack.items() if key != 'blocks'}
+            for block_name, block in slot_rack.get('blocks', {}).items():
+                record = {'rack': slot_rack['rack'], 'slot': slot_rack['slot'], 'block': block_name}
+                record.update((key, value) for key, value in block.items() if key != 'data')
+                if 'data' in block:
+                    record['digest'] = store.put_blob(block['data'])
+                    record['size'] = len(block['data'])
+                yield record
+
     def export(self, extracted):
         super().export(extracted)
-        raw_files_dir = self.output_dir.joinpath('S7RawFileParser')
-        raw_files_dir.mkdir(parents=True, exist_ok=True)
+        store = ArtifactStore(self.output_dir.joinpath('S7RawFileParser'))
 
+        # Devices acquired by connect_async are indexed already, only results holding block bytes are written here
         for addresses in extracted:
             for address, data in addresses.items():
-                file_name = f'{address.replace(".", "_")}.json'
-                with open(raw_files_dir.joinpath(file_name), 'w') as f:
-                    f.write(json.dumps(data, default=data_struct_serializer, indent=4))
+                if any('data' in block for slot_rack in data for block in slot_rack.get('blocks', {}).values()):
+                    store.write_index(address.replace(".", "_"), self._export_records(store, data),
+                                      default=data_struct_serializer)
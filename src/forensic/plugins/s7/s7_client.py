@@ -1,51 +1,170 @@
+import asyncio
 import socket
-from typing import List
+from collections import defaultdict, deque
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Generator, List
 from forensic.plugins.s7.cotp import COTP, COTP_DT, COTPLayer, COTP_CR
 from forensic.plugins.s7.s7_parser import (S7ListBlocksEntry, S7ListBlocksOfTypeEntry, S7Parser, S7LayerResponse,
-                                           NOT_LAST_DATA_UNIT, S7Error, S7ErrorNotPermitted, NO_ERROR)
-from forensic.plugins.s7.tpkt import TPKT, TPKTLayer
+                                           NOT_LAST_DATA_UNIT, S7Error, S7ErrorNotPermitted, NO_ERROR, MAX_PDU_LENGTH,
+                                           S7BlockInfo)
+from forensic.plugins.s7.tpkt import TPKT, TPKTLayer, TPKTFramer
 from forensic.common.stream.stream import (BinaryWriter, BinaryReader, DataStruct, StreamNotEnoughData)
 
+# A job yields the S7 requests to send and is sent back their parsed responses
+S7Job = Generator[BinaryWriter, S7LayerResponse, object]
+
+RECV_SIZE = 65536
+
 
 class InvalidS7RackSlot(Exception):
     pass
 
-class S7Conn(object):
-    def __init__(self, logger, ip: str, port: int = 102, rack: int = 0, slot: int = 0, timeout=20) -> None:
-        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+
+class S7SessionReset(ConnectionResetError):
+    """The CPU accepted and set up the session, then reset the connection"""
+
+
+class S7Gather(object):
+    """Yielded by a job to run other jobs side by side, the job is sent back their results or exceptions in order"""
+
+    def __init__(self, jobs: List[S7Job]) -> None:
+        self.jobs = list(jobs)
+
+
+class S7Pipeline(object):
+    """Runs a job and the jobs it gathers on one connection.
+
+    Up to max_outstanding requests are in flight at once, responses are handed to the job that sent the request
+    with the same PDU reference.
+    """
+
+    def __init__(self, job: S7Job, max_outstanding: int = 1) -> None:
+        self._max_outstanding = max(1, max_outstanding)
+        self._root = job
+        self._ready = deque([(job, None, None)])
+        self._queued = deque()
+        self._in_flight = {}
+        self._parents = {}
+        self._gathered = {}
+        self._result = None
+        self._error = None
+        self.done = False
+
+    @staticmethod
+    def _pdu_ref(request: bytes) -> bytes:
+        return request[4:6]
+
+    def _advance(self, job: S7Job, response, error: Exception):
+        try:
+            item = job.throw(error) if error is not None else job.send(response)
+        except StopIteration as e:
+            self._finish(job, e.value, None)
+        except Exception as e:
+            self._finish(job, None, e)
+        else:
+            if isinstance(item, S7Gather):
+                self._gathered[job] = [[None] * len(item.jobs), len(item.jobs)]
+                for index, child in enumerate(item.jobs):
+                    self._parents[child] = (job, index)
+                    self._ready.append((child, None, None))
+                if not item.jobs:
+                    self._ready.append((job, [], None))
+            else:
+                self._queued.append((job, item))
+
+    def _finish(self, job: S7Job, result, error: Exception):
+        if job is self._root:
+            self._result, self._error, self.done = result, error, True
+            return
+
+        parent, index = self._parents.pop(job)
+        results = self._gathered[parent]
+        results[0][index] = error if error is not None else result
+        results[1] -= 1
+        if results[1] == 0:
+            del self._gathered[parent]
+            self._ready.append((parent, results[0], None))
+
+    def requests(self) -> List[BinaryWriter]:
+        """Advances the jobs that got their responses and returns the requests that can be sent now"""
+        while self._ready:
+            self._advance(*self._ready.popleft())
+
+        requests = []
+        while self._queued and len(self._in_flight) < self._max_outstanding:
+            job, request = self._queued.popleft()
+            self._in_flight[self._pdu_ref(request.dump())] = job
+            requests.append(request)
+
+        return requests
+
+    def feed(self, pdu_ref: bytes, response: S7LayerResponse, error: Exception = None):
+        job = self._in_flight.pop(pdu_ref, None)
+
+        # Devices answering with another reference can still be served one request at a time
+        if job is None and len(self._in_flight) == 1:
+            job = self._in_flight.pop(next(iter(self._in_flight)))
+
+        if job is not None:
+            self._ready.append((job, response, error))
+
+    def fail(self, error: Exception):
+        """The connection failed, every request in flight gets the error"""
+        for job in self._in_flight.values():
+            self._ready.append((job, None, error))
+
+        self._in_flight.clear()
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+
+        return self._result
+
+
+class S7Session(object):
+    """S7 protocol logic shared by the blocking and the asyncio connections, which only drive its jobs."""
+
+    def __init__(self, logger, ip: str, port: int = 102, rack: int = 0, slot: int = 0, timeout=20,
+                 pdu_length: int = MAX_PDU_LENGTH) -> None:
         self._ip = ip
         self._port = port
         self._s7_parser = S7Parser()
         self._rack = rack
         self._slot = slot
+        self._timeout = timeout
+        self._max_outstanding = 1
+        self._requested_pdu_length = pdu_length
+        # Granted by the device, in the COTP connection confirm and the setup communication
+        self.tpdu_size = None
+        self.pdu_length = None
+        self._framer = TPKTFramer()
+        self._dt_units = []
+        # Set once sending or receiving failed, the connection is no longer in a known state
+        self._transport_error = None
         self.logger = logger
-        self._sock.settimeout(timeout)
 
-    def __enter__(self):
-        self._sock.connect((self._ip, self._port))
-        self.create_session(self._rack, self._slot)
-
-        return self
+    @property
+    def healthy(self) -> bool:
+        return self._transport_error is None
 
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        self._sock.close()
-
-    def create_session(self, rack: int = 0, slot: int = 0):
-        data = TPKT().write(3, COTP().write_cr(0, 0x14, 0x100, 0x100 + (rack * 0x20) + slot)).dump()
-        self._sock.sendall(data)
-
-        try:
-            cotp = self.parse_cotp(BinaryReader(self._sock.recv(1024)))
-        except ConnectionResetError:
-            raise InvalidS7RackSlot()
+    def _write_cr(self, rack: int, slot: int) -> bytes:
+        return TPKT().write(3, COTP().write_cr(0, 0x14, 0x100, 0x100 + (rack * 0x20) + slot)).dump()
 
+    def _is_setup_needed(self, cotp: COTPLayer) -> bool:
         if cotp is None:
             raise InvalidS7RackSlot()
 
-        if isinstance(cotp.cotp_data, COTP_CR) and cotp.cotp_data.flags == 0:
-            self.setup_communication()
+        return isinstance(cotp.cotp_data, COTP_CR) and cotp.cotp_data.flags == 0
+
+    def _write_dt(self, bw_data: BinaryWriter) -> bytes:
+        return TPKT().write(3, COTP().write_dt() + bw_data).dump()
+
+    def _write_ack(self) -> bytes:
+        return TPKT().write(3, COTP().write_dt_empty()).dump()
 
-    def parse_cotp(self, br: BinaryReader, is_recurse: bool = False) -> [COTPLayer, BinaryReader]:
+    def parse_cotp(self, br: BinaryReader) -> [COTPLayer, BinaryReader]:
+        """Parses a TPKT frame, the returned reader holds the S7 PDU once the last COTP data unit arrived"""
         cotp = None
 
         if br.remaining_data() > TPKTLayer.get_size():
@@ -54,17 +173,26 @@ class S7Conn(object):
             if tpkt.real_length > COTPLayer.get_size():
                 cotp = COTP().parse(br)
 
-                # Not last data unit
-                if isinstance(cotp.cotp_data, COTP_DT) and cotp.cotp_data.last_data_unit == 0:
-                    if tpkt.length > 7:
-                        # TODO: COTP_DT data layer aggregation
-                        pass
-                    else:
-                        # Avoid endless recurse, do it just once, otherwise drop it...
-                        if not is_recurse:
-                            cotp = self.parse_cotp(br, is_recurse=True)
+                if isinstance(cotp.cotp_data, COTP_CR) and isinstance(cotp.cotp_data.vars.tpdu_size, int):
+                    self.tpdu_size = 1 << cotp.cotp_data.vars.tpdu_size
+
+                if isinstance(cotp.cotp_data, COTP_DT):
+                    # PDUs larger than the TPDU size come in several data units, the empty ones are acks
+                    if cotp.cotp_data.last_data_unit == 0:
+                        if br.remaining_data() > 0:
+                            self._dt_units.append(br.read_view(br.remaining_data()))
+
+                        return cotp, None
 
-        return cotp
+                    if self._dt_units:
+                        self._dt_units.append(br.read_view(br.remaining_data()))
+                        br = BinaryReader(b''.join(self._dt_units))
+                        self._dt_units = []
+
+        return cotp, br
+
+    def _is_complete(self, cotp: COTPLayer, br: BinaryReader) -> bool:
+        return cotp is not None and br is not None and br.remaining_data() > 0
 
     def parse_s7(self, cotp: COTPLayer, br: BinaryReader) -> S7LayerResponse:
         s7layer = None
@@ -78,74 +206,75 @@ class S7Conn(object):
 
         return s7layer
 
-    def _send_ack(self):
-        self._sock.sendall(TPKT().write(3, COTP().write_dt_empty()).dump())
-
-    def _req_rep(self, bw_data: BinaryWriter) -> S7LayerResponse:
-        data = TPKT().write(3, COTP().write_dt() + bw_data).dump()
-        self._sock.sendall(data)
-
-        is_emnpty_cotp_ack = True
+    def parse_response(self, cotp: COTPLayer, br: BinaryReader) -> [bytes, S7LayerResponse, Exception]:
+        pdu_ref = br.peek_bytes(6)[4:6] if br.remaining_data() >= 6 else None
 
-        while is_emnpty_cotp_ack:
-            br = BinaryReader(self._sock.recv(4096))
-            cotp = self.parse_cotp(br)
+        try:
+            return pdu_ref, self.parse_s7(cotp, br), None
+        except Exception as e:
+            return pdu_ref, None, e
 
-            if br.remaining_data() > 0:
-                is_emnpty_cotp_ack = False
+    def _setup_communication(self) -> S7Job:
+        response = yield self._s7_parser.write_setup_communication(pdu_length=self._requested_pdu_length)
 
-        self._send_ack()
-        return self.parse_s7(cotp, br)
+        # The jobs the device accepts to have outstanding at once, and the PDU length it sizes its responses to
+        if response is not None and response.param is not None:
+            self._max_outstanding = max(1, min(response.param.max_sessions, response.param.curr_sessions))
+            self.pdu_length = response.param.pdu_length
 
-    def setup_communication(self):
-        return self._req_rep(self._s7_parser.write_setup_communication())
+        return response
 
-    def read_szl(self, szl_id: int, szl_index: int = 0) -> List[DataStruct]:
-        response = self._req_rep(self._s7_parser.write_read_szl(szl_id, szl_index))
+    def _read_szl(self, szl_id: int, szl_index: int = 0) -> S7Job:
+        response = yield self._s7_parser.write_read_szl(szl_id, szl_index)
 
         n_limit = 20
         while response is not None and response.param.last_data_unit == NOT_LAST_DATA_UNIT \
                 and response.param.sequence_num != 0 and n_limit > 0:
-            response = self._req_rep(self._s7_parser.write_read_szl(szl_id, szl_index, response.param.sequence_num))
+            response = yield self._s7_parser.write_read_szl(szl_id, szl_index, response.param.sequence_num)
             n_limit -= 1
 
         return response if response is None else response.data.szl_list
 
-    def list_blocks(self) -> List[S7ListBlocksEntry]:
-        response = self._req_rep(self._s7_parser.write_list_blocks())
+    def _list_blocks(self) -> S7Job:
+        response = yield self._s7_parser.write_list_blocks()
 
         n_limit = 20
         while response is not None and response.param.last_data_unit == NOT_LAST_DATA_UNIT \
                 and response.param.sequence_num != 0 and n_limit > 0:
-            response = self._req_rep(self._s7_parser.write_list_blocks(response.param.sequence_num))
+            response = yield self._s7_parser.write_list_blocks(response.param.sequence_num)
             n_limit -= 1
 
         return [] if (response is None or response.data is None) else response.data.entries
 
-    def list_blocks_of_type(self, block_type: str) -> List[S7ListBlocksOfTypeEntry]:
-        response = self._req_rep(self._s7_parser.write_list_blocks_of_type(block_type))
+    def _list_blocks_of_type(self, block_type: str) -> S7Job:
+        response = yield self._s7_parser.write_list_blocks_of_type(block_type)
 
         n_limit = 20
         while response is not None and response.param.last_data_unit == NOT_LAST_DATA_UNIT \
                 and response.param.sequence_num != 0 and n_limit > 0:
-            response = self._req_rep(self._s7_parser.write_list_blocks_of_type(block_type, response.param.sequence_num))
+            response = yield self._s7_parser.write_list_blocks_of_type(block_type, response.param.sequence_num)
             n_limit -= 1
 
         return [] if (response is None or response.data is None) else response.data.entries
 
-    def blocks(self):
+    def _blocks(self) -> S7Job:
         res = []
 
         try:
-            for block_count_entry in self.list_blocks():
-                if block_count_entry.block_count > 0:
-                    try:
-                        for block_entry in self.list_blocks_of_type(block_count_entry.block_type):
-                            res.append({'type': block_count_entry.block_type, 'language': block_entry.block_lang,
-                                        'num': block_entry.block_number, 'flags': block_entry.block_flags})
-                    except S7Error:
-                        self.logger.warning(f'S7 client blocks error for IP: {self._ip}, '
-                                            f'Port: {self._port}, Rack: {self._rack}, Slot: {self._slot}')
+            block_types = [entry.block_type for entry in (yield from self._list_blocks()) if entry.block_count > 0]
+            block_lists = yield S7Gather(self._list_blocks_of_type(block_type) for block_type in block_types)
+
+            for block_type, block_entries in zip(block_types, block_lists):
+                if isinstance(block_entries, S7Error):
+                    self.logger.warning(f'S7 client blocks error for IP: {self._ip}, '
+                                        f'Port: {self._port}, Rack: {self._rack}, Slot: {self._slot}')
+                    continue
+                elif isinstance(block_entries, Exception):
+                    raise block_entries
+
+                for block_entry in block_entries:
+                    res.append({'type': block_type, 'language': block_entry.block_lang,
+                                'num': block_entry.block_number, 'flags': block_entry.block_flags})
 
         except S7Error:
             self.logger.warning(f'S7 client blocks error for IP: {self._ip}, '
@@ -153,46 +282,60 @@ class S7Conn(object):
 
         return res
 
-    def _start_upload(self, block_type, block_num) -> S7LayerResponse:
-        return self._req_rep(self._s7_parser.write_start_upload(block_type, block_num))
-
-    def _upload(self, upload_id: int) -> S7LayerResponse:
-        return self._req_rep(self._s7_parser.write_upload(upload_id))
-
-    def _end_upload(self, upload_id: int) -> S7LayerResponse:
-        return self._req_rep(self._s7_parser.write_end_upload(upload_id))
-
-    def upload_block(self, block: dict) -> bytes:
-        start_upload = self._start_upload(block['type'], block['num'])
+    def _upload_block(self, block: dict) -> S7Job:
+        start_upload = yield self._s7_parser.write_start_upload(block['type'], block['num'])
         block_data = None
 
         if start_upload.error == NO_ERROR:
             upload_id = start_upload.param.upload_id
-            upload = self._upload(upload_id)
+            upload = yield self._s7_parser.write_upload(upload_id)
             block_data = upload.param.data
 
             while upload.param.status == NOT_LAST_DATA_UNIT:
-                upload = self._upload(upload_id)
+                upload = yield self._s7_parser.write_upload(upload_id)
                 block_data += upload.param.data
 
-            self._end_upload(upload_id)
+            yield self._s7_parser.write_end_upload(upload_id)
 
         return block_data
 
-    def upload_all_blocks(self):
+    def _block_info(self, block: dict) -> S7Job:
+        response = yield self._s7_parser.write_block_info(block['type'], block['num'])
+
+        return None if response is None else response.data
+
+    def _blocks_info(self, blocks: List[dict]) -> S7Job:
+        res = []
+
+        for block, info in zip(blocks, (yield S7Gather(self._block_info(block) for block in blocks))):
+            if isinstance(info, S7Error):
+                self.logger.warning(f'S7 client block info error for {block["type"]}{block["num"]}, IP: {self._ip}, '
+                                    f'Port: {self._port}, Rack: {self._rack}, Slot: {self._slot}')
+                info = None
+            elif isinstance(info, Exception):
+                raise info
+
+            res.append(info)
+
+        return res
+
+    def _upload_blocks(self, blocks: List[dict]) -> S7Job:
         all_blocks = {}
 
-        for block in self.blocks():
+        for block in blocks:
             block['protected'] = False
 
             for _ in range(5):
                 try:
-                    block['data'] = self.upload_block(block)
+                    block['data'] = yield from self._upload_block(block)
                 except S7ErrorNotPermitted:
                     block['protected'] = True
                 except Exception as e:
                     self.logger.warning(f'Upload all blocks exception {e} for IP: {self._ip}, '
                                         f'Port: {self._port}, Rack: {self._rack}, Slot: {self._slot}')
+                    if not self.healthy:
+                        # Retrying on this connection would fail the same way
+                        raise
 
                     continue
                 break
@@ -201,33 +344,304 @@ class S7Conn(object):
 
         return all_blocks
 
-    def dump_plc(self):
+    def _upload_all_blocks(self) -> S7Job:
+        return (yield from self._upload_blocks((yield from self._blocks())))
+
+    def _dump_plc(self, upload: bool = True) -> S7Job:
         res = None
 
         try:
-            szl_0_res = self.read_szl(0)
+            szl_0_res = yield from self._read_szl(0)
         except S7Error:
             szl_0_res = None
 
         if szl_0_res:
             res = {'rack': self._rack, 'slot': self._slot, 'supported_szl': list(map(lambda x: x.szl_id, szl_0_res)), 'szl': dict()}
-            for szl in [0x11, 0x424, 0x1c]:
-                if szl in res['supported_szl']:
-                    try:
-                        if szl_res := self.read_szl(szl):
-                            res['szl']['szl_%04X' % szl] = szl_res
-                    except S7Error:
-                        pass
-
-            for szl, index in [(0x31, 3), (0x32, 4)]:
-                if szl in res['supported_szl']:
-                    try:
-                        if szl_res := self.read_szl(szl, index):
-                            res['szl'][f'szl_%04X_%04X' % (szl, index)] = szl_res
-                    except S7Error:
-                        pass
-
-            if block_res := self.upload_all_blocks():
+            szl_reads = [('szl_%04X' % szl, szl, 0) for szl in [0x11, 0x424, 0x1c] if szl in res['supported_szl']]
+            szl_reads += [('szl_%04X_%04X' % (szl, index), szl, index) for szl, index in [(0x31, 3), (0x32, 4)]
+                          if szl in res['supported_szl']]
+
+            szl_results = yield S7Gather(self._read_szl(szl, index) for _, szl, index in szl_reads)
+            for (name, _, _), szl_res in zip(szl_reads, szl_results):
+                if isinstance(szl_res, S7Error):
+                    continue
+                elif isinstance(szl_res, Exception):
+                    raise szl_res
+                elif szl_res:
+                    res['szl'][name] = szl_res
+
+            if upload and (block_res := (yield from self._upload_all_blocks())):
                 res['blocks'] = block_res
 
         return res
+
+
+class S7Conn(S7Session):
+    def __init__(self, logger, ip: str, port: int = 102, rack: int = 0, slot: int = 0, timeout=20,
+                 pdu_length: int = MAX_PDU_LENGTH) -> None:
+        super().__init__(logger, ip, port, rack, slot, timeout, pdu_length)
+        self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._sock.settimeout(timeout)
+
+    def __enter__(self):
+        self._sock.connect((self._ip, self._port))
+        self.create_session(self._rack, self._slot)
+
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._sock.close()
+
+    def _recv(self, size: int) -> bytes:
+        data = self._sock.recv(size)
+
+        if not data:
+            raise ConnectionResetError()
+
+        return data
+
+    def _recv_frame(self) -> BinaryReader:
+        while (frame := self._framer.next_frame()) is None:
+            self._framer.feed(self._recv(RECV_SIZE))
+
+        return BinaryReader(frame)
+
+    def _execute(self, job: S7Job):
+        pipeline = S7Pipeline(job, self._max_outstanding)
+
+        while True:
+            requests = pipeline.requests()
+            if pipeline.done:
+                return pipeline.result()
+
+            try:
+                if self._transport_error is not None:
+                    raise self._transport_error
+
+                for request in requests:
+                    self._sock.sendall(self._write_dt(request))
+
+                pipeline.feed(*self._recv_response())
+            except Exception as e:
+                self._transport_error = e
+                pipeline.fail(e)
+
+    def create_session(self, rack: int = 0, slot: int = 0):
+        self._sock.sendall(self._write_cr(rack, slot))
+
+        try:
+            cotp, _ = self.parse_cotp(self._recv_frame())
+        except ConnectionResetError:
+            raise InvalidS7RackSlot()
+
+        if self._is_setup_needed(cotp):
+            self.setup_communication()
+
+    def _send_ack(self):
+        self._sock.sendall(self._write_ack())
+
+    def _recv_response(self) -> [bytes, S7LayerResponse, Exception]:
+        cotp, br = self.parse_cotp(self._recv_frame())
+
+        while not self._is_complete(cotp, br):
+            cotp, br = self.parse_cotp(self._recv_frame())
+
+        self._send_ack()
+        return self.parse_response(cotp, br)
+
+    def setup_communication(self):
+        return self._execute(self._setup_communication())
+
+    def read_szl(self, szl_id: int, szl_index: int = 0) -> List[DataStruct]:
+        return self._execute(self._read_szl(szl_id, szl_index))
+
+    def list_blocks(self) -> List[S7ListBlocksEntry]:
+        return self._execute(self._list_blocks())
+
+    def list_blocks_of_type(self, block_type: str) -> List[S7ListBlocksOfTypeEntry]:
+        return self._execute(self._list_blocks_of_type(block_type))
+
+    def blocks(self):
+        return self._execute(self._blocks())
+
+    def upload_block(self, block: dict) -> bytes:
+        return self._execute(self._upload_block(block))
+
+    def blocks_info(self, blocks: List[dict]) -> List[S7BlockInfo]:
+        return self._execute(self._blocks_info(blocks))
+
+    def upload_blocks(self, blocks: List[dict]):
+        return self._execute(self._upload_blocks(blocks))
+
+    def upload_all_blocks(self):
+        return self._execute(self._upload_all_blocks())
+
+    def dump_plc(self, upload: bool = True):
+        return self._execute(self._dump_plc(upload))
+
+
+class S7AsyncConn(S7Session):
+    def __init__(self, logger, ip: str, port: int = 102, rack: int = 0, slot: int = 0, timeout=20,
+                 pdu_length: int = MAX_PDU_LENGTH) -> None:
+        super().__init__(logger, ip, port, rack, slot, timeout, pdu_length)
+        self._reader = None
+        self._writer = None
+
+    async def __aenter__(self):
+        self._reader, self._writer = await asyncio.wait_for(asyncio.open_connection(self._ip, self._port),
+                                                            self._timeout)
+
+        try:
+            await self.create_session(self._rack, self._slot)
+        except BaseException:
+            await self.close()
+            raise
+
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    async def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
+            try:
+                await self._writer.wait_closed()
+            except OSError:
+                pass
+
+            self._writer = None
+
+    async def _send(self, data: bytes):
+        self._writer.write(data)
+        await asyncio.wait_for(self._writer.drain(), self._timeout)
+
+    async def _recv(self, size: int) -> bytes:
+        data = await asyncio.wait_for(self._reader.read(size), self._timeout)
+
+        if not data:
+            raise ConnectionResetError()
+
+        return data
+
+    async def _recv_frame(self) -> BinaryReader:
+        while (frame := self._framer.next_frame()) is None:
+            self._framer.feed(await self._recv(RECV_SIZE))
+
+        return BinaryReader(frame)
+
+    async def _execute(self, job: S7Job):
+        pipeline = S7Pipeline(job, self._max_outstanding)
+
+        while True:
+            requests = pipeline.requests()
+            if pipeline.done:
+                return pipeline.result()
+
+            try:
+                if self._transport_error is not None:
+                    raise self._transport_error
+
+                for request in requests:
+                    self._writer.write(self._write_dt(request))
+
+                if requests:
+                    await asyncio.wait_for(self._writer.drain(), self._timeout)
+
+                pipeline.feed(*(await self._recv_response()))
+            except Exception as e:
+                self._transport_error = e
+                pipeline.fail(e)
+
+    async def create_session(self, rack: int = 0, slot: int = 0):
+        await self._send(self._write_cr(rack, slot))
+
+        try:
+            cotp, _ = self.parse_cotp(await self._recv_frame())
+        except ConnectionResetError:
+            raise InvalidS7RackSlot()
+
+        if self._is_setup_needed(cotp):
+            await self.setup_communication()
+
+    async def _recv_response(self) -> [bytes, S7LayerResponse, Exception]:
+        cotp, br = self.parse_cotp(await self._recv_frame())
+
+        while not self._is_complete(cotp, br):
+            cotp, br = self.parse_cotp(await self._recv_frame())
+
+        await self._send(self._write_ack())
+        return self.parse_response(cotp, br)
+
+    async def setup_communication(self):
+        return await self._execute(self._setup_communication())
+
+    async def read_szl(self, szl_id: int, szl_index: int = 0) -> List[DataStruct]:
+        return await self._execute(self._read_szl(szl_id, szl_index))
+
+    async def list_blocks(self) -> List[S7ListBlocksEntry]:
+        return await self._execute(self._list_blocks())
+
+    async def list_blocks_of_type(self, block_type: str) -> List[S7ListBlocksOfTypeEntry]:
+        return await self._execute(self._list_blocks_of_type(block_type))
+
+    async def blocks(self):
+        return await self._execute(self._blocks())
+
+    async def upload_block(self, block: dict) -> bytes:
+        return await self._execute(self._upload_block(block))
+
+    async def blocks_info(self, blocks: List[dict]) -> List[S7BlockInfo]:
+        return await self._execute(self._blocks_info(blocks))
+
+    async def upload_blocks(self, blocks: List[dict]):
+        return await self._execute(self._upload_blocks(blocks))
+
+    async def upload_all_blocks(self):
+        return await self._execute(self._upload_all_blocks())
+
+    async def dump_plc(self, upload: bool = True):
+        return await self._execute(self._dump_plc(upload))
+
+
+class S7SessionPool(object):
+    """Sessions kept open by (ip, rack, slot) between the requests of an acquisition.
+
+    A session goes back to the pool after each request and serves the next one as long as its connection is healthy,
+    a session whose connection failed is closed and the next request opens a new one.
+    """
+
+    def __init__(self, logger, port: int = 102, timeout=20, pdu_length: int = MAX_PDU_LENGTH) -> None:
+        self.logger = logger
+        self._port = port
+        self._timeout = timeout
+        self._pdu_length = pdu_length
+        self._idle = defaultdict(list)
+
+    @asynccontextmanager
+    async def session(self, ip: str, rack: int = 0, slot: int = 0) -> AsyncIterator[S7AsyncConn]:
+        idle = self._idle[(ip, rack, slot)]
+        if idle:
+            conn = idle.pop()
+        else:
+            conn = await S7AsyncConn(self.logger, ip, self._port, rack, slot, self._timeout,
+                                     self._pdu_length).__aenter__()
+
+        reusable = False
+        try:
+            yield conn
+            reusable = True
+        except Exception:
+            # A request the device refused leaves the session usable, a cancelled one does not
+            reusable = True
+            raise
+        finally:
+            if reusable and conn.healthy:
+                idle.append(conn)
+            else:
+                await conn.close()
+
+    async def close(self, ip: str, rack: int = 0, slot: int = 0):
+        for conn in self._idle.pop((ip, rack, slot), []):
+            await conn.close()
@@ -4,7 +4,7 @@ from typing import Any
 
 from forensic.plugins.s7.s7_szl import SZL_MAP
 from forensic.common.stream.stream import BinaryWriter, BinaryReader, ubyte, uint16be, DataStruct, \
-    ascii_string, dynamic, uint32be, bytesbe, uint16le
+    ascii_string, dynamic, uint32be, bytesbe, uint16le, nt_ascii_string
 
 ROSCTR_JOB = 0x01
 ROSCTR_ERROR_ACK = 0x02
@@ -24,12 +24,18 @@ FUNCTION_BLOCK = 3
 SUBFUNCTION_READ_SZL = 0x01
 SUBFUNCTION_LIST_BLOCK = 0x01
 SUBFUNCTION_LIST_BLOCKS_OF_TYPE = 0x02
+SUBFUNCTION_BLOCK_INFO = 0x03
 
 YES_LAST_DATA_UNIT = 0x00
 NOT_LAST_DATA_UNIT = 0x01
 
 NO_ERROR = 0
 
+# Jobs proposed to be outstanding at once in each direction (AmQ calling/called) in the setup communication
+MAX_AMQ = 8
+# PDU length proposed in the setup communication, the largest S7-400/1500 CPUs grant. Smaller CPUs answer with theirs
+MAX_PDU_LENGTH = 960
+
 BLOCK_TYPE_MAP = {'08': 'OB',
                   '0A': 'DB',
                   '0B': 'SDB',
@@ -101,12 +107,12 @@ class S7ListBlocks(DataStruct):
     entries = dynamic
 
 
-class S7ListBlocksEntry(DataStruct):
+class S7ListBlocksEntry(DataStruct, compact=True):
     block_type = ascii_string(2)
     block_count = uint16be
 
 
-class S7ListBlocksOfTypeEntry(DataStruct):
+class S7ListBlocksOfTypeEntry(DataStruct, compact=True):
     block_number = uint16be
     block_flags = ubyte
     block_lang = ubyte
@@ -214,6 +220,44 @@ class S7ParamEndUploadRequest(DataStruct):
     upload_id = uint32be
 
 
+class S7BlockInfoRequest(DataStruct):
+    return_code = ubyte
+    transport_size = ubyte
+    length = uint16be
+    block_type = ascii_string(2)
+    block_number = ascii_string(5)
+    filesystem = ascii_string(1)
+
+
+class S7BlockInfo(DataStruct):
+    constant1 = ubyte
+    block_type = ubyte
+    constant2 = uint16be
+    constant3 = uint16be
+    header = bytesbe(2)
+    unknown1 = ubyte
+    block_flags = ubyte
+    block_lang = ubyte
+    sub_block_type = ubyte
+    block_number = uint16be
+    load_memory_length = uint32be
+    block_security = uint32be
+    code_timestamp = bytesbe(6)
+    interface_timestamp = bytesbe(6)
+    ssb_length = uint16be
+    add_length = uint16be
+    local_data_length = uint16be
+    mc7_length = uint16be
+    author = nt_ascii_string(8)
+    family = nt_ascii_string(8)
+    name = nt_ascii_string(8)
+    version = ubyte
+    unknown2 = ubyte
+    check_sum = uint16be
+    reserved1 = uint32be
+    reserved2 = uint32be
+
+
 class S7DataFragment(DataStruct):
     return_code = ubyte
     transport_size = ubyte
@@ -317,12 +361,15 @@ class S7Parser:
 
                 if not (layer.param.last_data_unit == NOT_LAST_DATA_UNIT and layer.param.sequence_num != 0):
                     br = BinaryReader(self._aggregated_buffer[seq_num])
+                    # Entries are counted over all the fragments, not just the last one
+                    fragment.length = len(self._aggregated_buffer[seq_num])
                     del self._aggregated_buffer[seq_num]
 
             if not (layer.param.last_data_unit == NOT_LAST_DATA_UNIT and layer.param.sequence_num != 0):
                 func_parsers = {(FUNCTION_CPU, SUBFUNCTION_READ_SZL): self.parse_szl_data,
                                 (FUNCTION_BLOCK, SUBFUNCTION_LIST_BLOCK): self.parse_list_blocks_data,
-                                (FUNCTION_BLOCK, SUBFUNCTION_LIST_BLOCKS_OF_TYPE): self.parse_list_blocks_of_type_data}
+                                (FUNCTION_BLOCK, SUBFUNCTION_LIST_BLOCKS_OF_TYPE): self.parse_list_blocks_of_type_data,
+                                (FUNCTION_BLOCK, SUBFUNCTION_BLOCK_INFO): self.parse_block_info_data}
 
                 func = layer.param.function & 0x0F
                 if (func, layer.param.sub_function) in func_parsers:
@@ -351,8 +398,8 @@ class S7Parser:
         res = S7ListBlocks(br)
         res.entries = []
 
-        for _ in range(fragment.length // 4):
-            entry = S7ListBlocksEntry(br)
+        for values in br.read_structs(S7ListBlocksEntry, fragment.length // 4):
+            entry = S7ListBlocksEntry.from_values(values)
 
             if entry.block_type in BLOCK_TYPE_MAP:
                 entry.block_type = BLOCK_TYPE_MAP[entry.block_type]
@@ -365,8 +412,8 @@ class S7Parser:
         res = S7ListBlocks(br)
         res.entries = []
 
-        for _ in range(fragment.length // 4):
-            entry = S7ListBlocksOfTypeEntry(br)
+        for values in br.read_structs(S7ListBlocksOfTypeEntry, fragment.length // 4):
+            entry = S7ListBlocksOfTypeEntry.from_values(values)
 
             if entry.block_lang in BLOCK_LANGUAGE_MAP:
                 entry.block_lang = BLOCK_LANGUAGE_MAP[entry.block_lang]
@@ -375,6 +422,9 @@ class S7Parser:
 
         return res
 
+    def parse_block_info_data(self, br: BinaryReader, fragment: S7DataFragment) -> S7BlockInfo:
+        return S7BlockInfo(br)
+
     def write_header(self, rosctr: int, param: BinaryWriter = BinaryWriter(),
                      data: BinaryWriter = BinaryWriter()) -> BinaryWriter:
         bw = BinaryWriter()
@@ -388,13 +438,13 @@ class S7Parser:
 
         return bw + param + data
 
-    def write_setup_communication(self) -> BinaryWriter:
+    def write_setup_communication(self, max_amq: int = MAX_AMQ, pdu_length: int = MAX_PDU_LENGTH) -> BinaryWriter:
         param = BinaryWriter()
         param.write_struct(S7ParamSetupCommunication, {'function': PARAM_FUNCTION_SETUP_COMM,
                                                        'reserved': 0,
-                                                       'max_sessions': 1,
-                                                       'curr_sessions': 1,
-                                                       'pdu_length': 480})
+                                                       'max_sessions': max_amq,
+                                                       'curr_sessions': max_amq,
+                                                       'pdu_length': pdu_length})
         return self.write_header(ROSCTR_JOB, param)
 
     def build_user_data(self, function: int, sub_function: int) -> BinaryWriter:
@@ -466,6 +516,18 @@ class S7Parser:
 
         return self.build_user_data_packet(FUNCTION_BLOCK, SUBFUNCTION_LIST_BLOCKS_OF_TYPE, data, sequence_num)
 
+    def write_block_info(self, block_type: str, block_num: int, sequence_num: int = 0) -> BinaryWriter:
+        converted_block_type = reverse_map_convert(BLOCK_TYPE_MAP, block_type)
+        data = BinaryWriter()
+        data.write_struct(S7BlockInfoRequest, {'return_code': 0xff,
+                                               'transport_size': 9,
+                                               'length': 8,
+                                               'block_type': converted_block_type,
+                                               'block_number': '%05d' % block_num,
+                                               'filesystem': 'A'})
+
+        return self.build_user_data_packet(FUNCTION_BLOCK, SUBFUNCTION_BLOCK_INFO, data, sequence_num)
+
     def write_start_upload(self, block_type: str, block_num: int) -> BinaryWriter:
         converted_block_type = reverse_map_convert(BLOCK_TYPE_MAP, block_type)
         block_name = bytes('_%s%05dA' % (converted_block_type, block_num), 'ascii')
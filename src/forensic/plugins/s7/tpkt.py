@@ -1,3 +1,4 @@
+from typing import Optional
 from forensic.common.stream.stream import DataStruct, ubyte, uint16be, dynamic, BinaryReader, BinaryWriter
 
 SIZE_OF_HEADER = 4
@@ -24,3 +25,41 @@ class TPKT:
                                     'reserved': 0,
                                     'length': len(bw_cotp) + SIZE_OF_HEADER})
         return bw + bw_cotp
+
+
+class TPKTFramingError(Exception):
+    pass
+
+
+class TPKTFramer(object):
+    """Cuts a byte stream into whole TPKT frames, however it was segmented on the way.
+
+    Frames are views of the received data, only a frame split between reads is copied.
+    """
+
+    def __init__(self) -> None:
+        self._data = b''
+        self._pos = 0
+
+    def feed(self, data: bytes) -> None:
+        self._data = self._data[self._pos:] + data if self._pos < len(self._data) else data
+        self._pos = 0
+
+    def next_frame(self) -> Optional[memoryview]:
+        remaining = len(self._data) - self._pos
+
+        if remaining < SIZE_OF_HEADER:
+            return None
+
+        length = int.from_bytes(self._data[self._pos + 2:self._pos + SIZE_OF_HEADER], 'big')
+
+        if length < SIZE_OF_HEADER:
+            raise TPKTFramingError(f'TPKT length {length}')
+
+        if remaining < length:
+            return None
+
+        frame = memoryview(self._data)[self._pos:self._pos + length]
+        self._pos += length
+
+        return frame
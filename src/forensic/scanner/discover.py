@@ -1,14 +1,98 @@
+from __future__ import annotations
+import asyncio
+import bisect
 import socket
 import pandas as pd
 from ipaddress import IPv4Network, IPv4Address
 from pathlib import Path
-from typing import List
+from typing import AsyncIterator, Iterable, Iterator, List, Tuple
+from forensic.common.scheduler.scheduler import ConnectionScheduler
 from concurrent.futures import ThreadPoolExecutor
+import forensic.common.constants.constants as constants
+
+
+class IPRangeSet(object):
+    """Set of IPv4 addresses kept as sorted disjoint integer ranges, so its size doesn't grow with the ranges."""
+
+    def __init__(self) -> None:
+        self._starts = []
+        self._ends = []
+
+    def add(self, start: int, end: int) -> None:
+        # Merge with every range overlapping or adjacent to [start, end]
+        i = bisect.bisect_left(self._ends, start - 1)
+        j = bisect.bisect_right(self._starts, end + 1)
+        if i < j:
+            start = min(start, self._starts[i])
+            end = max(end, self._ends[j - 1])
+        self._starts[i:j] = [start]
+        self._ends[i:j] = [end]
+
+    def missing(self, start: int, end: int) -> Iterator[Tuple[int, int]]:
+        """Yields the parts of [start, end] not in the set."""
+        i = bisect.bisect_left(self._ends, start)
+        while start <= end:
+            if i == len(self._starts) or self._starts[i] > end:
+                yield start, end
+                return
+            if self._starts[i] > start:
+                yield start, self._starts[i] - 1
+            start = self._ends[i] + 1
+            i += 1
+
+    def __contains__(self, ip: int) -> bool:
+        i = bisect.bisect_left(self._ends, ip)
+        return i < len(self._starts) and self._starts[i] <= ip
+
+    @staticmethod
+    def from_networks(networks: Iterable[str]) -> IPRangeSet:
+        res = IPRangeSet()
+        for network in networks:
+            network = IPv4Network(network.strip(), strict=False)
+            res.add(int(network.network_address), int(network.broadcast_address))
+        return res
+
+
+class RttEstimator(object):
+    """Connect timeout derived from the observed round trips, as TCP does for retransmissions (RFC 6298)."""
+
+    def __init__(self, initial: float = constants.SCAN_INITIAL_TIMEOUT, minimum: float = constants.SCAN_MIN_TIMEOUT,
+                 maximum: float = constants.SCAN_MAX_TIMEOUT) -> None:
+        self.initial = initial
+        self.minimum = minimum
+        self.maximum = maximum
+        self._timeout = initial
+        self._srtt = None
+        self._rttvar = None
+
+    def timeout(self, attempt: int = 0) -> float:
+        # Retries never wait less than the initial timeout, the estimate may come from closer hosts
+        timeout = self._timeout * (2 ** attempt)
+        if attempt > 0:
+            timeout = max(timeout, self.initial * (2 ** (attempt - 1)))
+        return min(timeout, self.maximum)
+
+    def update(self, rtt: float) -> None:
+        if self._srtt is None:
+            self._srtt, self._rttvar = rtt, rtt / 2
+        else:
+            self._rttvar = 0.75 * self._rttvar + 0.25 * abs(self._srtt - rtt)
+            self._srtt = 0.875 * self._srtt + 0.125 * rtt
+        self._timeout = min(max(self._srtt + 4 * self._rttvar, self.minimum), self.maximum)
 
 
 class Discover(object):
-    def __init__(self):
+    def __init__(self, retries: int = constants.SCAN_RETRIES):
         self.scans = []
+        self.retries = retries
+        # Round trips differ from a subnet to the other, a routed subnet isn't timed by the LAN's refusals
+        self._rtts = {}
+
+    def _rtt(self, ip: str, scheduler: ConnectionScheduler) -> RttEstimator:
+        subnet = scheduler.subnet(ip)
+        if subnet not in self._rtts:
+            self._rtts[subnet] = RttEstimator()
+        return self._rtts[subnet]
 
     def _validate_connection(self, address: dict, port: int):
         s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
@@ -24,21 +108,72 @@ class Discover(object):
                 executor.submit(self._validate_connection, address, port)
         return [dict(s) for s in set(frozenset(d.items()) for d in self.scans)]
 
+    async def _connect(self, ip: str, port: int, timeout: float) -> None:
+        loop = asyncio.get_running_loop()
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.setblocking(False)
+            await asyncio.wait_for(loop.sock_connect(s, (ip, port)), timeout)
+
+    async def _validate_connection_async(self, address: dict, port: int, scheduler: ConnectionScheduler) -> bool:
+        loop = asyncio.get_running_loop()
+        rtt = self._rtt(address["ip"], scheduler)
+        for attempt in range(self.retries + 1):
+            async with scheduler.connection(address["ip"]):
+                start = loop.time()
+                try:
+                    await self._connect(address["ip"], port, rtt.timeout(attempt))
+                except asyncio.TimeoutError:
+                    # No answer isn't conclusive, retry with a longer timeout
+                    continue
+                except ConnectionRefusedError:
+                    # The host is up, only the port is closed
+                    rtt.update(loop.time() - start)
+                    return False
+                except OSError:
+                    return False
+                rtt.update(loop.time() - start)
+                return True
+        return False
+
+    async def _scan_worker(self, addresses, port: int, scheduler: ConnectionScheduler, found: asyncio.Queue):
+        for address in addresses:
+            if await self._validate_connection_async(address, port, scheduler):
+                found.put_nowait(address)
+
+    async def scan_stream(self, addresses: Iterable[dict], port: int,
+                          scheduler: ConnectionScheduler = None) -> AsyncIterator[dict]:
+        """Yields the addresses listening on the port as soon as they are found."""
+        scheduler = scheduler or ConnectionScheduler()
+        addresses = iter(addresses)
+        found = asyncio.Queue()
+        producer = asyncio.gather(
+            *(self._scan_worker(addresses, port, scheduler, found) for _ in range(constants.ASYNC_WORKERS)))
+        producer.add_done_callback(lambda _: found.put_nowait(None))
+        try:
+            while (address := await found.get()) is not None:
+                self.scans.append(address)
+                yield address
+            producer.result()
+        finally:
+            producer.cancel()
+
+    async def scan_async(self, addresses: List[dict], port: int, scheduler: ConnectionScheduler = None) -> List[dict]:
+        return [address async for address in self.scan_stream(addresses, port, scheduler)]
+
     @staticmethod
-    def get_socket_addresses(addresses: List[dict]):
-        extended_addresses = []
+    def get_socket_addresses(addresses: Iterable[dict], exclude: Iterable[str] = ()) -> Iterator[dict]:
+        """Lazily expands the addresses and CIDRs, skipping repeated and excluded addresses."""
+        seen = IPRangeSet.from_networks(exclude)
         for address in addresses:
             try:
-                IPv4Address(address["ip"])
-                extended_addresses.append(address)
-            except ValueError:
-                try:
-                    for ip in IPv4Network(address["ip"]):
-                        address["ip"] = str(ip)
-                        extended_addresses.append(address.copy())
-                except ValueError:
-                    pass
-        return extended_addresses
+                network = IPv4Network(address["ip"])
+            except (ValueError, TypeError):
+                continue
+            start, end = int(network.network_address), int(network.broadcast_address)
+            for missing_start, missing_end in list(seen.missing(start, end)):
+                for ip in range(missing_start, missing_end + 1):
+                    yield {**address, "ip": str(IPv4Address(ip))}
+            seen.add(start, end)
 
     @staticmethod
     def get_addresses_from_file(file_path: Path) -> List[dict]:
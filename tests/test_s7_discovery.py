@@ -0,0 +1,50 @@
+import asyncio
+from forensic.interfaces.plugin import PluginConfig
+from forensic.plugins.s7.s7 import S7
+from forensic.plugins.s7.s7_client import S7SessionReset
+
+
+class FakeS7(S7):
+    """Answers the requests of the plugin without a device, identification resets while reset is set"""
+
+    def __init__(self, output_dir, reset, resume=False):
+        super().__init__(PluginConfig('S7', [], 102, 'tcp', {'resume': resume}, []), output_dir, False)
+        self.reset = reset
+        self.probed = []
+
+    async def _request(self, address, rack, slot, request):
+        if request == self._identify:
+            self.probed.append((rack, slot))
+            if self.reset:
+                raise S7SessionReset()
+            return {'rack': rack, 'slot': slot, 'szl': {}}, 480
+        return []
+
+    def export(self, extracted):
+        pass
+
+
+def run(plugin, address):
+    async def sweep():
+        extracted = []
+        for socket in plugin._pending([address]):
+            await plugin._exec(socket, extracted)
+        return extracted
+    try:
+        return asyncio.run(sweep())
+    finally:
+        plugin.sweep.close()
+
+
+def test_reset_cpu_stops_discovery_and_is_retried_on_resume(tmp_path):
+    address = {'ip': '10.0.0.1'}
+    plugin = FakeS7(tmp_path, reset=True)
+    assert run(plugin, address) == []
+    # The CPU answered on the first common slot, no other rack/slot is probed
+    assert plugin.probed == [(0, 0)]
+    assert not plugin.sweep.done('10.0.0.1') and not plugin.sweep.done('10.0.0.1', 0, 0)
+
+    resumed = FakeS7(tmp_path, reset=False, resume=True)
+    extracted = run(resumed, address)
+    assert [(data['rack'], data['slot']) for data in extracted[0]['10.0.0.1']] == [(0, 0)]
+    assert resumed.sweep.done('10.0.0.1') and resumed.sweep.done('10.0.0.1', 0, 0)
@@ -0,0 +1,71 @@
+import logging
+import pytest
+from forensic.common.stream.stream import BinaryReader
+from forensic.plugins.s7.cotp import COTP_DT
+from forensic.plugins.s7.s7_client import S7Session
+from forensic.plugins.s7.tpkt import TPKTFramer, TPKTFramingError
+
+
+def tpkt(payload: bytes) -> bytes:
+    return b'\x03\x00' + (len(payload) + 4).to_bytes(2, 'big') + payload
+
+
+def dt(data: bytes, last: bool = True) -> bytes:
+    return tpkt(b'\x02\xf0' + (b'\x80' if last else b'\x00') + data)
+
+
+def frames(framer: TPKTFramer) -> list:
+    result = []
+    while (frame := framer.next_frame()) is not None:
+        result.append(bytes(frame))
+    return result
+
+
+def test_split_header():
+    frame = dt(b'\x32\x03')
+    framer = TPKTFramer()
+    framer.feed(frame[:2])
+    assert framer.next_frame() is None
+    framer.feed(frame[2:5])
+    assert framer.next_frame() is None
+    framer.feed(frame[5:])
+    assert frames(framer) == [frame]
+
+
+def test_several_frames_in_one_read():
+    first, second, third = dt(b'\x32\x01'), dt(b'\x32\x03\x00'), dt(b'')
+    framer = TPKTFramer()
+    framer.feed(first + second + third[:3])
+    assert frames(framer) == [first, second]
+    framer.feed(third[3:])
+    assert frames(framer) == [third]
+
+
+@pytest.mark.parametrize('length', [0, 3])
+def test_length_below_header(length):
+    framer = TPKTFramer()
+    framer.feed(b'\x03\x00' + length.to_bytes(2, 'big'))
+    with pytest.raises(TPKTFramingError):
+        framer.next_frame()
+
+
+def test_multi_dt_pdu():
+    session = S7Session(logging.getLogger('test'), '127.0.0.1')
+    cotp, br = session.parse_cotp(BinaryReader(dt(b'\x32\x03\x00', last=False)))
+    assert isinstance(cotp.cotp_data, COTP_DT) and br is None
+    cotp, br = session.parse_cotp(BinaryReader(dt(b'\x00\x01', last=False)))
+    assert br is None
+    cotp, br = session.parse_cotp(BinaryReader(dt(b'\x02\x03')))
+    assert br.read_view(br.remaining_data()).tobytes() == b'\x32\x03\x00\x00\x01\x02\x03'
+    # The next PDU does not carry the data units of the previous one
+    cotp, br = session.parse_cotp(BinaryReader(dt(b'\x32\x07')))
+    assert br.read_view(br.remaining_data()).tobytes() == b'\x32\x07'
+
+
+def test_empty_non_last_dt_ack():
+    session = S7Session(logging.getLogger('test'), '127.0.0.1')
+    cotp, br = session.parse_cotp(BinaryReader(dt(b'', last=False)))
+    assert isinstance(cotp.cotp_data, COTP_DT) and br is None
+    assert not session._is_complete(cotp, br)
+    cotp, br = session.parse_cotp(BinaryReader(dt(b'\x32\x03')))
+    assert br.read_view(br.remaining_data()).tobytes() == b'\x32\x03'
@@ -0,0 +1,60 @@
+import asyncio
+import threading
+import forensic.common.constants.constants as constants
+from forensic.interfaces.plugin import PluginConfig, PluginInterface
+
+
+class FakePlugin(PluginInterface):
+    def __init__(self, output_dir, results, resume=False, cb_event=None):
+        addresses = [{'ip': ip} for ip in results]
+        super().__init__(PluginConfig('Fake', addresses, 0, 'udp', {'resume': resume}, [], cb_event), output_dir, False)
+        self.results = results
+        self.exported = []
+        self.export_threads = set()
+
+    def connect(self, address):
+        result = self.results[address['ip']]
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    def export(self, extracted):
+        self.exported.extend(extracted)
+        self.export_threads.add(threading.current_thread())
+
+
+def sweep(plugin, addresses):
+    async def run():
+        extracted = []
+        for address in plugin._pending(addresses):
+            await plugin._exec(address, extracted)
+        return extracted
+    try:
+        return asyncio.run(run())
+    finally:
+        # Interrupted before finish, the journal is left for the resumed run
+        plugin.sweep.close()
+
+
+def test_resume_fetches_failed_devices_again(tmp_path):
+    addresses = [{'ip': '10.0.0.1'}, {'ip': '10.0.0.2'}, {'ip': '10.0.0.3'}]
+    results = {'10.0.0.1': {'10.0.0.1': [{'rack': 0}]}, '10.0.0.2': {}, '10.0.0.3': ConnectionResetError()}
+    plugin = FakePlugin(tmp_path, results)
+    assert len(sweep(plugin, addresses)) == 1
+    assert tmp_path.joinpath('Fake', constants.SWEEP_JOURNAL).read_text().splitlines() == ['{"key":["10.0.0.1"]}']
+
+    results.update({'10.0.0.2': {'10.0.0.2': [{'rack': 0}]}, '10.0.0.3': {'10.0.0.3': [{'rack': 0}]}})
+    resumed = FakePlugin(tmp_path, results, resume=True)
+    assert sweep(resumed, addresses) == [{'10.0.0.2': [{'rack': 0}]}, {'10.0.0.3': [{'rack': 0}]}]
+    assert len(resumed.sweep) == 3
+
+
+def test_run_exports_each_device_and_sends_one_export_event(tmp_path):
+    events = []
+    results = {'10.0.0.1': {'10.0.0.1': [{'rack': 0}]}, '10.0.0.2': {}, '10.0.0.3': {'10.0.0.3': [{'rack': 0}]}}
+    plugin = FakePlugin(tmp_path, results, cb_event=lambda name, extracted: events.append((name, extracted)))
+    plugin.run()
+    devices = [{'10.0.0.1': [{'rack': 0}]}, {'10.0.0.3': [{'rack': 0}]}]
+    assert sorted(plugin.exported, key=str) == devices
+    assert threading.main_thread() not in plugin.export_threads
+    assert [(name, sorted(extracted, key=str)) for name, extracted in events] == [('export', devices)]